@@ -0,0 +1,92 @@
+import logging
+import time
+import numpy as np
+import pandas as pd
+import get_downdetector_web
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 스파크라인 기반 자체 이상 감지
+# # # # # # # # # # # # # # #
+
+# 서비스 x 포인트 리포트 수 행렬 전체를 한번에 계산한다. (서비스 수천 개도 수 ms)
+# - 기준선 : 최근 구간을 뺀 과거 포인트의 EWMA (최근일수록 가중치가 큼)
+# - 변동폭 : 과거 포인트의 MAD (중앙값 절대 편차) 기반 robust 표준편차
+# - 점수 : 최근 구간 평균이 기준선에서 변동폭의 몇 배만큼 벗어났는지 (robust z)
+# - 기울기 : 최근 SLOPE_POINTS 개 포인트의 최소제곱 기울기를 변동폭으로 나눈 값
+
+EWMA_ALPHA = 0.1
+RECENT_POINTS = 2  # 현재 값으로 볼 최근 포인트 수 (30분)
+SLOPE_POINTS = 8  # 기울기를 볼 최근 포인트 수 (2시간)
+MIN_SCALE = 1.0  # 변동폭 하한 (리포트가 거의 없는 서비스에서 점수가 튀지 않도록)
+MIN_REPORTS = 10  # 최근 리포트 수가 이보다 적으면 이상으로 보지 않는다.
+
+WARNING_Z = 4.0
+DANGER_Z = 8.0
+WARNING_SLOPE_Z = 3.0  # 점수가 WARNING_Z 에 못 미쳐도 빠르게 오르는 중이면 주의
+SLOPE_MIN_Z = 3.0  # 단, 기울기만으로 주의를 줄 때도 점수가 이 값 이상이어야 한다. (잡음의 우연한 기울기 제외)
+
+MAD_TO_STD = 1.4826  # 정규분포 가정 시 MAD -> 표준편차 환산 계수
+
+
+# 과거 포인트에 곱할 EWMA 가중치 (합이 1)
+def get_ewma_weights(num_points, alpha=EWMA_ALPHA):
+    weights = alpha * (1 - alpha) ** np.arange(num_points - 1, -1, -1, dtype=np.float32)
+    return weights / weights.sum()
+
+
+# 최근 포인트의 최소제곱 기울기를 한번의 행렬곱으로 구하기 위한 가중치
+def get_slope_weights(num_points):
+    t = np.arange(num_points, dtype=np.float32)
+    t -= t.mean()
+    return t / (t * t).sum()
+
+
+# 리턴: (점수 float32 배열, 기울기 점수 float32 배열, 등급 코드 int8 배열 - CLASS_DTYPE 순서)
+def detect_anomalies(values_matrix):
+    num_services, num_points = values_matrix.shape
+    if num_services == 0 or num_points <= max(RECENT_POINTS, SLOPE_POINTS):
+        empty = np.zeros(num_services, dtype=np.float32)
+        return empty, empty.copy(), np.zeros(num_services, dtype=np.int8)
+
+    matrix = values_matrix.astype(np.float32, copy=False)
+    history = matrix[:, :-RECENT_POINTS]
+
+    baseline = history @ get_ewma_weights(history.shape[1])
+    median = np.median(history, axis=1)
+    scale = np.maximum(np.median(np.abs(history - median[:, None]), axis=1) * MAD_TO_STD, MIN_SCALE)
+
+    current = matrix[:, -RECENT_POINTS:].mean(axis=1)
+    score = (current - baseline) / scale
+    slope_score = (matrix[:, -SLOPE_POINTS:] @ get_slope_weights(SLOPE_POINTS)) * SLOPE_POINTS / scale
+
+    enough = current >= MIN_REPORTS
+    level_codes = np.zeros(num_services, dtype=np.int8)
+    rising = (slope_score >= WARNING_SLOPE_Z) & (score >= SLOPE_MIN_Z)
+    level_codes[enough & ((score >= WARNING_Z) | rising)] = 1
+    level_codes[enough & (score >= DANGER_Z)] = 2
+
+    return score.astype(np.float32), slope_score.astype(np.float32), level_codes
+
+
+# df 에 ANOMALY(등급), ANOMALY_SCORE(점수) 컬럼을 CLASS 옆에 추가한다. (df 행 순서 = 행렬 행 순서)
+def add_anomaly_columns(df_, values_matrix):
+    start_time = time.perf_counter()
+    score, _, level_codes = detect_anomalies(values_matrix)
+
+    for column in (get_downdetector_web.ANOMALY, get_downdetector_web.ANOMALY_SCORE):
+        if column in df_.columns:
+            df_.drop(columns=column, inplace=True)
+
+    class_loc = df_.columns.get_loc(get_downdetector_web.CLASS) + 1 \
+        if get_downdetector_web.CLASS in df_.columns else len(df_.columns)
+    df_.insert(class_loc, get_downdetector_web.ANOMALY,
+               pd.Categorical.from_codes(level_codes, dtype=get_downdetector_web.CLASS_DTYPE))
+    df_.insert(class_loc + 1, get_downdetector_web.ANOMALY_SCORE, score)
+
+    logging.info(f'이상 감지 완료 - {len(df_)}개 서비스, {(level_codes > 0).sum()}개 이상, '
+                 f'{(time.perf_counter() - start_time) * 1000:.1f}ms')
@@ -0,0 +1,143 @@
+# 성능 측정 스크립트
+# 사용법: python benchmark.py startup
+import logging
+import statistics
+import subprocess
+import sys
+import timeit
+
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 시작 시간 측정
+# # # # # # # # # # # # # # #
+
+
+# 새 파이썬 프로세스에서 모듈 import 시간과 무거운 모듈 로딩 여부를 잰다.
+STARTUP_CODE = """
+import time
+start_time = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start_time
+import sys
+heavy_list = [name for name in ('selenium', 'webdriver_manager', 'selenium_stealth', 'matplotlib')
+              if name in sys.modules]
+print(f'{{elapsed:.4f}}|{{",".join(heavy_list)}}')
+"""
+
+
+def bench_startup(module_list=('get_downdetector_web', 'config'), repeat=5):
+    for module in module_list:
+        elapsed_list = []
+        heavy_list = ''
+        for _ in range(repeat):
+            res = subprocess.run([sys.executable, '-c', STARTUP_CODE.format(module=module)],
+                                 capture_output=True, text=True)
+            if res.returncode != 0:
+                logging.error(f'{module} import 실패!\n{res.stderr}')
+                break
+
+            elapsed, heavy_list = res.stdout.strip().splitlines()[-1].split('|')
+            elapsed_list.append(float(elapsed))
+
+        if len(elapsed_list) == 0:
+            continue
+
+        logging.info(f'import {module}: 중앙값 {statistics.median(elapsed_list) * 1000:.0f}ms, '
+                     f'최소 {min(elapsed_list) * 1000:.0f}ms ({repeat}회), '
+                     f'로딩된 무거운 모듈: {heavy_list or "없음"}')
+
+
+# # # # # # # # # # # # # # #
+# 서비스 조회 측정 (iterrows 전체 탐색 vs 해시 인덱스)
+# # # # # # # # # # # # # # #
+
+
+def make_bench_status_df(num_services, area='US'):
+    import get_downdetector_web
+
+    data = [{get_downdetector_web.NAME: f'Service {i:05d}',
+             get_downdetector_web.VALUES: '[' + ', '.join(['1'] * get_downdetector_web.SPARKLINE_POINTS) + ']',
+             get_downdetector_web.CLASS: get_downdetector_web.SUCCESS} for i in range(num_services)]
+    return get_downdetector_web.make_status_df(data, area)
+
+
+# 기존 get_service_chart_mapdf 의 전체 탐색 방식
+def scan_lookup(df_, area, service_name):
+    import get_downdetector_web
+
+    for i, row in df_.iterrows():
+        if row[get_downdetector_web.NAME].upper() == service_name.upper() \
+                and row[get_downdetector_web.AREA].upper() == area.upper():
+            return row[get_downdetector_web.CLASS], row[get_downdetector_web.VALUES]
+    return None, None
+
+
+def index_lookup(df_, values_matrix, service_index, area, service_name):
+    import get_downdetector_web
+
+    row = service_index.get((area.casefold(), service_name.casefold()))
+    if row is None:
+        return None, None
+    return df_[get_downdetector_web.CLASS].iat[row], values_matrix[row]
+
+
+def bench_lookup(num_services_list=(300, 1000, 3000), num_targets=40, repeat=3):
+    import get_downdetector_web
+
+    for num_services in num_services_list:
+        df_ = make_bench_status_df(num_services)
+        values_matrix = get_downdetector_web.make_values_matrix(df_)
+        service_index = get_downdetector_web.make_service_index(df_)
+
+        # 대시보드 한 화면 분량의 감시 서비스 (목록 전체에 골고루 분포)
+        target_list = [f'SERVICE {i:05d}' for i in range(0, num_services, max(1, num_services // num_targets))]
+
+        scan_sec = min(timeit.repeat(lambda: [scan_lookup(df_, 'US', name) for name in target_list],
+                                     number=1, repeat=repeat))
+        index_sec = min(timeit.repeat(lambda: [index_lookup(df_, values_matrix, service_index, 'US', name)
+                                               for name in target_list],
+                                      number=1, repeat=repeat))
+        build_sec = min(timeit.repeat(lambda: get_downdetector_web.make_service_index(df_), number=1, repeat=repeat))
+
+        logging.info(f'서비스 {num_services}개, 조회 {len(target_list)}건: '
+                     f'전체 탐색 {scan_sec * 1000:.1f}ms, 해시 인덱스 {index_sec * 1000:.3f}ms '
+                     f'({scan_sec / index_sec:.0f}배), 인덱스 생성 {build_sec * 1000:.2f}ms')
+
+
+# # # # # # # # # # # # # # #
+# 이상 감지 측정 (서비스 x 포인트 행렬 한번에 계산)
+# # # # # # # # # # # # # # #
+
+
+def bench_anomaly(num_services_list=(1000, 5000, 20000), repeat=5):
+    import numpy as np
+    import anomaly_detector
+    import get_downdetector_web
+
+    rng = np.random.default_rng(0)
+    for num_services in num_services_list:
+        values_matrix = rng.poisson(20, (num_services, get_downdetector_web.SPARKLINE_POINTS)).astype(np.int32)
+        values_matrix[::50, -3:] *= 10  # 2% 는 최근 급증
+
+        detect_sec = min(timeit.repeat(lambda: anomaly_detector.detect_anomalies(values_matrix),
+                                       number=1, repeat=repeat))
+        _, _, level_codes = anomaly_detector.detect_anomalies(values_matrix)
+        logging.info(f'서비스 {num_services}개: 이상 감지 {detect_sec * 1000:.2f}ms, '
+                     f'주의 {(level_codes == 1).sum()}개, 위험 {(level_codes == 2).sum()}개')
+
+
+BENCH_FUNC_DICT = {
+    'startup': bench_startup,
+    'lookup': bench_lookup,
+    'anomaly': bench_anomaly,
+}
+
+
+if __name__ == '__main__':
+    bench_name_list = sys.argv[1:] or list(BENCH_FUNC_DICT)
+    for bench_name in bench_name_list:
+        BENCH_FUNC_DICT[bench_name]()
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+import pandas as pd
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 페이지별 서킷 브레이커
+# # # # # # # # # # # # # # #
+
+# 키(지역, 카테고리)별로 연속 실패 횟수를 센다.
+# - 실패하면 open : base_sec x 2^(연속 실패 - 1) (최대 max_sec) 동안 요청하지 않는다.
+# - 그 시간이 지나면 half-open : 한번 시도해보고 성공하면 closed, 실패하면 더 길게 open.
+# 실패한 페이지는 그동안 마지막으로 성공한 결과를 이전 데이터로 표시해서 보여준다.
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    def __init__(self, base_sec, max_sec):
+        self.base_sec = base_sec
+        self.max_sec = max_sec
+        self._lock = threading.Lock()
+        self._failure_count_dict = dict()  # 키 -> 연속 실패 횟수
+        self._open_until_dict = dict()  # 키 -> 다시 시도할 수 있는 시각 (epoch 초)
+        self._last_error_dict = dict()  # 키 -> 마지막 실패 시각
+
+    def get_state(self, key, now=None):
+        now = now or time.time()
+        with self._lock:
+            if self._failure_count_dict.get(key, 0) == 0:
+                return CLOSED
+            return OPEN if now < self._open_until_dict[key] else HALF_OPEN
+
+    # 지금 요청해도 되는지 여부
+    def allow(self, key, now=None):
+        return self.get_state(key, now) != OPEN
+
+    def record_success(self, key):
+        with self._lock:
+            failure_count = self._failure_count_dict.pop(key, 0)
+            self._open_until_dict.pop(key, None)
+        if failure_count > 0:
+            logging.info(f'{key} 서킷 closed - 연속 실패 {failure_count}회 후 복구')
+
+    def record_failure(self, key, now=None):
+        now = now or time.time()
+        with self._lock:
+            failure_count = self._failure_count_dict.get(key, 0) + 1
+            backoff_sec = min(self.base_sec * 2 ** (failure_count - 1), self.max_sec)
+            self._failure_count_dict[key] = failure_count
+            self._open_until_dict[key] = now + backoff_sec
+            self._last_error_dict[key] = now
+        logging.error(f'{key} 서킷 open - 연속 실패 {failure_count}회, {backoff_sec:.0f}초 후 재시도')
+
+    # 실패 중인(closed 가 아닌) 키 목록
+    def get_failing_set(self):
+        with self._lock:
+            return {key for key, failure_count in self._failure_count_dict.items() if failure_count > 0}
+
+    def get_stats_df(self):
+        now = time.time()
+        with self._lock:
+            row_list = [{'key': key, 'failures': failure_count,
+                         'retry_in_sec': max(0, round(self._open_until_dict[key] - now)),
+                         'last_error_at': self._last_error_dict.get(key)}
+                        for key, failure_count in self._failure_count_dict.items() if failure_count > 0]
+        return pd.DataFrame(row_list)
@@ -3,7 +3,11 @@ import logging
 import pickle
 import streamlit as st
 import time
+import threading
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from datetime import datetime
 import pytz
 
@@ -36,6 +40,16 @@ logging.basicConfig(level=logging.INFO, handlers=[handler])
 
 
 import get_downdetector_web
+import status_crawler
+import report_history
+import top_movers
+import rate_limiter
+import crawl_planner
+import circuit_breaker
+import news_client
+import translator
+import prefetcher
+import service_matcher
 
 
 # 파일명 등 각종 설정
@@ -51,6 +65,83 @@ KEY_PATH = 'key.json'
 
 COMPANIES_LIST_FILE = 'companies_list_dd.pkl'
 
+# 지역/카테고리별 마지막 크롤링 결과 저장 폴더 (parquet)
+SNAPSHOT_DIR = 'snapshots'
+
+# 서비스별 리포트 수 장기 이력 저장 폴더
+HISTORY_DIR = 'history'
+HISTORY_ROLLUP_INTERVAL_MIN = 60  # 리포트 이력 시간/일 단위 집계 주기
+TOP_MOVERS_SIZE = 20  # 급상승 서비스 순위 개수
+
+# 리포트 차트 조회 기간 (표시명: 시간)
+CHART_PERIOD_DICT = {
+    '24시간': 24,
+    '7일': 24 * 7,
+    '30일': 24 * 30,
+}
+
+
+# 크롤링 대상 카테고리
+CATEGORY_LIST = [
+    get_downdetector_web.TELECOM,
+    get_downdetector_web.ONLINE_SERVICE,
+    get_downdetector_web.SOCIAL_MEDIA,
+    get_downdetector_web.FINANCE,
+    get_downdetector_web.GAMING,
+]
+
+# 크롤링 동시성 설정
+CRAWL_MAX_WORKERS = 10  # 동시에 크롤링할 최대 페이지 수 (지역 x 카테고리)
+
+# 호스트별 요청 제한 (토큰 버킷)
+# rate : 초당 요청 수, burst : 몰아서 보낼 수 있는 요청 수, concurrency : 동시 요청 수
+NEWS_HOST = news_client.NEWS_HOST
+NOMINATIM_HOST = 'nominatim.openstreetmap.org'
+TRANSLATE_HOST = 'translation.googleapis.com'
+HOST_RATE_DICT = {
+    'downdetector.com': {'rate': 1.0, 'burst': 3, 'concurrency': 3},
+    'downdetector.jp': {'rate': 1.0, 'burst': 3, 'concurrency': 3},
+    NEWS_HOST: {'rate': 2.0, 'burst': 5, 'concurrency': 4},
+    NOMINATIM_HOST: {'rate': 1.0, 'burst': 1, 'concurrency': 1},  # Nominatim 사용 정책: 초당 1회
+    TRANSLATE_HOST: {'rate': 10.0, 'burst': 10, 'concurrency': 4},
+}
+DEFAULT_HOST_RATE = {'rate': 1.0, 'burst': 1, 'concurrency': 2}
+
+# 백그라운드 크롤러 설정 (모든 세션 공용)
+# (지역, 카테고리) 페이지마다 상황에 따라 주기를 따로 정한다. (crawl_planner 참고)
+CRAWL_TICK_SEC = 30  # 크롤링할 페이지가 있는지 확인하는 주기
+CRAWL_MIN_INTERVAL_MIN = 1  # 감시 중인 서비스에 알람이 있는 페이지
+CRAWL_INTERVAL_MIN = 3  # 기본 주기 (알람이 있거나 감시 중인 서비스가 있는 페이지)
+CRAWL_MAX_INTERVAL_MIN = 15  # 조용한 페이지가 늘어날 수 있는 최대 주기
+WATCH_EXPIRE_MIN = 60  # 세션이 이 시간 동안 다시 등록하지 않은 감시 서비스는 빠진다.
+CRAWL_BREAKER_BASE_SEC = 60  # 페이지 크롤링 실패 시 첫 재시도 대기 시간 (연속 실패마다 2배)
+CRAWL_BREAKER_MAX_MIN = 30  # 재시도 대기 시간 최대값
+
+# 뉴스 검색 설정
+NEWS_CACHE_TTL_SEC = 180  # 같은 검색어의 RSS 응답을 재사용하는 시간 (미리 가져온 뉴스가 다음 크롤링까지 유지되도록)
+NEWS_BATCH_MAX_WORKERS = 8  # 알람 서비스 뉴스를 한번에 가져올 때 동시 요청 수 (호스트 제한은 따로 적용)
+
+# 새로 알람이 뜬 서비스의 뉴스/번역 미리 가져오기 - 뉴스 페이지 기본 검색 조건과 같게 맞춘다.
+PREFETCH_AND_KEYWORD_LIST = ['outage']
+PREFETCH_SEARCH_HOUR = 1
+PREFETCH_MAX_PER_SNAPSHOT = 20
+
+# 광역 뉴스 피드 (한번 가져와서 전체 서비스 목록과 역매칭)
+BROAD_NEWS_QUERY_LIST = ['outage', 'down', 'blackout']
+
+# 뉴스 제목에서 서비스명 대신 쓰이는 별칭 (서비스명 자체, 괄호 안 이름, '/' 로 나뉜 이름은 자동 등록)
+SERVICE_ALIAS_DICT = {
+    'Amazon Web Services': ['AWS'],
+    'AWS': ['Amazon Web Services'],
+    'Microsoft 365': ['Office 365', 'M365'],
+    'Microsoft Azure': ['Azure'],
+    'Google Cloud': ['GCP', 'Google Cloud Platform'],
+    'X (Twitter)': ['X', 'Twitter'],
+    'Facebook Messenger': ['Messenger'],
+    'PlayStation Network': ['PSN'],
+}
+FIRST_CRAWL_TIMEOUT_SEC = 300  # 최초 스냅샷을 기다리는 최대 시간
+
 
 # 색상 코드
 GREEN = '#66FF66BB'
@@ -180,6 +271,9 @@ def init_session_state():
     if 'status_df_dict' not in st.session_state:
         st.session_state.status_df_dict = dict()
 
+    if 'status_snapshot_dict' not in st.session_state:
+        st.session_state.status_snapshot_dict = dict()
+
     if 'game_df_dict' not in st.session_state:
         st.session_state.game_df_dict = dict()
 
@@ -205,9 +299,6 @@ def init_session_state():
     if "geolocations_dict" not in st.session_state:
         st.session_state.geolocations_dict = pickle_load_cache_file(GEOLOC_CACHE_FILE, dict)
 
-    if 'trans_text_list' not in st.session_state:
-        st.session_state.trans_text_list = pickle_load_cache_file(TRANS_CACHE_FILE, list)
-
     if "news_list" not in st.session_state:
         st.session_state.news_list = []
 
@@ -217,6 +308,9 @@ def init_session_state():
     if 'search_interval_min' not in st.session_state:
         st.session_state.search_interval_min = 5
 
+    # 공용 상태 크롤러 기동 (프로세스당 1회, 디스크에 저장된 마지막 스냅샷도 이때 올라온다)
+    get_status_crawler()
+
 
 # # # # # # # # # # # # # # #
 # 피클 파일 로딩 함수
@@ -240,72 +334,370 @@ def pickle_load_cache_file(filename, default_type):
 # # # # # # # # # # # # # # #
 
 
-def get_service_chart_df_by_url_list(area):
-    if area is None:
-        logging.info(f'{area=} 크롤링 미실행!')
-        return None
-
-    logging.info(f'===== {area} 전체 크롤링 시작 =====')
-
+def get_downdetector_url(area, category):
     if area.upper() == 'JP':
         postfix = 'jp'
     else:
         postfix = 'com'
 
-    categories_list = [
-        get_downdetector_web.TELECOM,
-        get_downdetector_web.ONLINE_SERVICE,
-        get_downdetector_web.SOCIAL_MEDIA,
-        get_downdetector_web.FINANCE,
-        get_downdetector_web.GAMING,
-    ]
-
-    # url_list = [  # f'https://downdetector.{postfix}/',
-    #             f'https://downdetector.{postfix}/telecom/',
-    #             f'https://downdetector.{postfix}/online-services/',
-    #             f'https://downdetector.{postfix}/social-media/',
-    #             f'https://downdetector.{postfix}/finance/',
-    #             f'https://downdetector.{postfix}/gaming/',
-    #             ]
+    return f'https://downdetector.{postfix}/{category}/'
+
+
+# 호스트별 요청 제한 (프로세스당 1개, 모든 세션/스레드가 공유)
+@st.cache_resource
+def get_rate_limiter():
+    return rate_limiter.HostRateLimiter(HOST_RATE_DICT, DEFAULT_HOST_RATE)
+
+
+# 호스트별 요청 제한에 맞춰 크롤링 작업을 돌리는 스케줄러
+@st.cache_resource
+def get_crawl_scheduler():
+    return rate_limiter.RateLimitedScheduler(get_rate_limiter(), max_workers=CRAWL_MAX_WORKERS)
+
+
+# 해당 호스트의 요청 제한 자리를 얻는다. (with 문으로 사용)
+def host_slot(host):
+    return get_rate_limiter().slot(host)
+
+
+# 구글 뉴스 RSS 공용 클라이언트 (프로세스당 1개, 모든 세션이 캐시를 공유)
+@st.cache_resource
+def get_news_client():
+    return news_client.NewsClient(ttl_sec=NEWS_CACHE_TTL_SEC, slot_func=host_slot)
+
+
+# 영어 -> 한국어 번역 (프로세스당 1개, 모든 세션이 번역 캐시를 공유)
+@st.cache_resource
+def get_translator():
+    return translator.Translator(KEY_PATH, translator.TranslationCache(TRANS_CACHE_FILE),
+                                 slot_func=host_slot, host=TRANSLATE_HOST)
+
+
+# 서비스 뉴스를 가져와서 제목까지 번역해 공용 캐시에 채운다. (뉴스 페이지 기본 검색 조건)
+def prefetch_service_news(area, service_name):
+    query = news_client.build_news_query(service_name, PREFETCH_AND_KEYWORD_LIST)
+    rss_text = get_news_client().fetch_search(query, PREFETCH_SEARCH_HOUR)
+    if rss_text is None:
+        return
+
+    news_df = news_client.parse_search_rss(rss_text, service_name)
+    for title in news_df['제목']:
+        get_translator().translate(title)
+    get_translator().cache.flush()
+    logging.info(f'{area} {service_name} 뉴스 {len(news_df)}건 미리 가져오기 완료')
+
+
+@st.cache_resource
+def get_news_prefetcher():
+    return prefetcher.NewsPrefetcher(prefetch_service_news, max_per_snapshot=PREFETCH_MAX_PER_SNAPSHOT)
+
+
+# 스냅샷의 알람 서비스 목록 (다운디텍터 또는 자체 이상 감지가 WARNING 이상). 등급, 이상 점수 높은 순
+def get_snapshot_alarm_name_list(snapshot):
+    df_ = snapshot.df
+    level_codes = df_[get_downdetector_web.CLASS].cat.codes.to_numpy()
+    score = np.zeros(len(df_), dtype=np.float32)
+    if get_downdetector_web.ANOMALY in df_.columns:
+        level_codes = np.maximum(level_codes, df_[get_downdetector_web.ANOMALY].cat.codes.to_numpy())
+        score = df_[get_downdetector_web.ANOMALY_SCORE].to_numpy()
+
+    alarm_rows = np.flatnonzero(level_codes >= 1)
+    alarm_rows = alarm_rows[np.lexsort((-score[alarm_rows], -level_codes[alarm_rows]))]
+    return df_[get_downdetector_web.NAME].to_numpy()[alarm_rows].tolist()
+
+
+# 리턴: (df, 서비스 x 포인트 int32 행렬) - 실패 시 (None, None)
+# 리포트 수는 페이지마다 여기서 1번만 행렬로 만들고, 급상승 순위/크롤링 주기/장기 이력이 같이 쓴다.
+def get_category_df(area, category):
+    url_item = get_downdetector_url(area, category)
+    df_ = get_downdetector_web.get_downdetector_df(url=url_item, area=area)
+
+    if df_ is None:
+        return None, None
+
+    # 종류 구분을 첨부해준다.
+    df_[get_downdetector_web.CATEGORY] = pd.Categorical([category] * len(df_),
+                                                        dtype=get_downdetector_web.CATEGORY_DTYPE)
+    values_matrix = get_downdetector_web.make_values_matrix(df_)
+
+    # 페이지가 도착하는 대로 급상승 순위에 반영한다.
+    get_top_movers().update_page(area, category, df_, values_matrix)
+    return df_, values_matrix
+
+
+# (지역, 카테고리) 페이지 목록을 한번에 동시 크롤링한다. (목록 순서대로 먼저 제출)
+# 리턴: {(지역, 카테고리): (df, 리포트 수 행렬) - 실패 시 (None, None)}
+def get_category_df_dict(job_list):
+    logging.info(f'===== 동시 크롤링 시작 : {len(job_list)}개 페이지 {job_list} =====')
+    start_time = time.monotonic()
+
+    # 호스트별 토큰이 허용하는 만큼 바로바로 실행된다.
+    scheduler = get_crawl_scheduler()
+    future_dict = {job: scheduler.submit(urlparse(get_downdetector_url(*job)).netloc, get_category_df, *job)
+                   for job in job_list}
+
+    category_df_dict = dict()
+    for job, future in future_dict.items():
+        try:
+            category_df_dict[job] = future.result()
+        except Exception as e:
+            logging.error(f'{job} 크롤링 에러 - {e}')
+            category_df_dict[job] = None, None
+
+    logging.info(f'===== 동시 크롤링 종료 : {time.monotonic() - start_time:.1f}초 =====')
+    return category_df_dict
+
+
+# 한 지역의 카테고리별 df를 합친다.
+# 여러 카테고리에 같은 서비스가 있으면 이번에 성공한 페이지를 먼저, 그 안에서는 카테고리 목록 순서대로 우선한다.
+# crawled_at_dict : {(지역, 카테고리): 크롤링 시각}, stale_key_set : 이번에 실패해서 이전 결과를 쓰는 페이지
+def merge_category_dfs(area, category_df_dict, crawled_at_dict=None, stale_key_set=frozenset()):
+    crawled_at_dict = crawled_at_dict or dict()
 
     df_list = []
-    for category_item in categories_list:
-        url_item = f'https://downdetector.{postfix}/{category_item}/'
-        df_ = get_downdetector_web.get_downdetector_df(url=url_item, area=area)
-        if df_ is not None:
-            df_[get_downdetector_web.CATEGORY] = category_item  # 종류 구분을 첨부해준다.
-            df_list.append(df_)
-        time.sleep(1)  # guard time
+    for category_item in CATEGORY_LIST:
+        key = (area, category_item)
+        df_ = category_df_dict.get(key)
+        if df_ is None:
+            continue
+        df_list.append(df_.assign(**{get_downdetector_web.CRAWLED_AT: crawled_at_dict.get(key, float('nan')),
+                                     get_downdetector_web.STALE: key in stale_key_set}))
 
     if len(df_list) == 0:
         logging.error(f'===== {area} 전체 크롤링 실패!!! =====')
         return None
 
     total_df = (pd.concat(df_list, ignore_index=True)
-                .drop_duplicates(subset=get_downdetector_web.NAME, keep='first'))
+                .sort_values(get_downdetector_web.STALE, kind='stable')
+                .drop_duplicates(subset=get_downdetector_web.NAME, keep='first')
+                .reset_index(drop=True))
+    get_downdetector_web.set_category_dtypes(total_df)
+
+    stale_category_list = [category_item for area_key, category_item in stale_key_set
+                           if area_key == area and (area_key, category_item) in category_df_dict]
+    if len(stale_category_list) > 0:
+        logging.error(f'===== {area} {stale_category_list} 크롤링 실패 - 이전 결과로 대체 =====')
 
     logging.info(f'===== {area} 전체 크롤링 및 df 변환 완료 =====')
     return total_df
 
 
-def refresh_status_and_save_companies(area):
-    # 세션상태 방어 코드
-    init_session_state()
+# # # # # # # # # # # # # # #
+# 크롤링 결과 저장/로딩 (parquet)
+# # # # # # # # # # # # # # #
 
-    # 상태 받아오기
-    st.session_state.status_df_dict[area] = get_service_chart_df_by_url_list(area)
 
-    if st.session_state.status_df_dict[area] is None or len(st.session_state.status_df_dict[area]) == 0:
-        logging.error(f'{area} status_df 갱신 실패!')
-        return
+def get_snapshot_file(area, category):
+    return os.path.join(SNAPSHOT_DIR, f'{area}_{category}.parquet')
+
+
+# 성공한 카테고리 결과를 파일로 저장한다. 임시 파일에 쓰고 교체해서 깨진 파일이 남지 않게 한다.
+def save_category_df(area, category, df_):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    filename = get_snapshot_file(area, category)
+    try:
+        df_.to_parquet(filename + '.tmp', index=False)
+        os.replace(filename + '.tmp', filename)
+    except Exception as e:
+        logging.error(f'{area} {category} 스냅샷 파일 저장 실패 - {e}')
+
+
+# 저장된 카테고리 결과들을 불러온다.
+# 리턴: {(지역, 카테고리): df}, {(지역, 카테고리): 저장 시각}
+def load_category_df_dict(area_list):
+    category_df_dict = dict()
+    saved_at_dict = dict()
+
+    for area_item in area_list:
+        for category_item in CATEGORY_LIST:
+            filename = get_snapshot_file(area_item, category_item)
+            if not os.path.exists(filename):
+                continue
+            try:
+                category_df_dict[(area_item, category_item)] = pd.read_parquet(filename)
+                saved_at_dict[(area_item, category_item)] = os.path.getmtime(filename)
+            except Exception as e:
+                logging.error(f'{area_item} {category_item} 스냅샷 파일 로딩 실패 - {e}')
+
+    logging.info(f'저장된 스냅샷 파일 로딩 완료 : {len(category_df_dict)}개')
+    return category_df_dict, saved_at_dict
+
+
+# 페이지별 크롤링 주기 관리 (프로세스당 1개)
+@st.cache_resource
+def get_crawl_planner():
+    return crawl_planner.CrawlPlanner(min_interval_sec=CRAWL_MIN_INTERVAL_MIN * 60,
+                                      base_interval_sec=CRAWL_INTERVAL_MIN * 60,
+                                      max_interval_sec=CRAWL_MAX_INTERVAL_MIN * 60)
+
+
+# 세션들이 보고 있는 감시 서비스 목록 (프로세스당 1개)
+@st.cache_resource
+def get_watch_registry():
+    return crawl_planner.WatchRegistry(WATCH_EXPIRE_MIN * 60)
+
+
+# 화면에 띄운 감시 서비스를 등록해서 해당 페이지가 더 자주 크롤링되게 한다.
+def register_watch_list(area, name_list):
+    get_watch_registry().register(area, name_list)
+
+
+# 페이지별 크롤링 실패 시 재시도 간격 관리 (프로세스당 1개)
+@st.cache_resource
+def get_crawl_breaker():
+    return circuit_breaker.CircuitBreaker(base_sec=CRAWL_BREAKER_BASE_SEC, max_sec=CRAWL_BREAKER_MAX_MIN * 60)
+
+
+# 페이지별 마지막 성공 결과와 그 시각. 이번에 크롤링하지 않았거나 실패한 페이지는 이걸로 합친다.
+_latest_category_lock = threading.Lock()
+_latest_category_df_dict = dict()
+_latest_crawled_at_dict = dict()
+
+
+def set_latest_category_df(area, category, df_, crawled_at):
+    with _latest_category_lock:
+        _latest_category_df_dict[(area, category)] = df_
+        _latest_crawled_at_dict[(area, category)] = crawled_at
+
+
+# 여러 지역에서 크롤링할 때가 된 페이지만 동시에 크롤링한다. (서킷이 열린 페이지는 건너뜀)
+# 리턴: {지역: df 또는 None} - 이번에 크롤링한 페이지가 있는 지역만
+def get_service_chart_df_dict(area_list):
+    area_list = [area_item for area_item in area_list if area_item is not None]
+    key_list = [(area_item, category_item) for area_item in area_list for category_item in CATEGORY_LIST]
+
+    planner = get_crawl_planner()
+    breaker = get_crawl_breaker()
+    due_list = [key for key in planner.get_due_list(key_list) if breaker.allow(key)]
+    if len(due_list) == 0:
+        return dict()
+
+    category_df_dict = get_category_df_dict(due_list)
+    crawled_at = time.time()
+
+    for (area_item, category_item), (df_, values_matrix) in category_df_dict.items():
+        if df_ is None:
+            # 실패한 페이지의 재시도 시각은 서킷 브레이커만 정한다. (60초, 120초, ... 두배씩)
+            # 플래너 주기는 건드리지 않아서 이미 지난 시각이므로, 브레이커가 허용하는 즉시 다시 크롤링한다.
+            breaker.record_failure((area_item, category_item))
+            continue
+
+        breaker.record_success((area_item, category_item))
+        planner.update((area_item, category_item), df_, values_matrix, get_watch_registry().get_set(area_item))
+
+        # 성공한 페이지는 다음 기동 때 바로 보여줄 수 있도록 저장해둔다.
+        save_category_df(area_item, category_item, df_)
+        set_latest_category_df(area_item, category_item, df_, crawled_at)
+
+        # 장기 이력에는 이번에 크롤링한 페이지만 크롤링 시각 기준으로 덧붙인다.
+        # (스냅샷에는 이번에 크롤링하지 않은 페이지도 합쳐져 있어서 발행 시각 기준으로 넣으면 옛 값이 새 슬롯에 들어간다.)
+        get_report_history().append_snapshot(area_item, df_[get_downdetector_web.NAME].tolist(), values_matrix,
+                                             crawled_at)
+
+    with _latest_category_lock:
+        latest_category_df_dict = dict(_latest_category_df_dict)
+        latest_crawled_at_dict = dict(_latest_crawled_at_dict)
+
+    # 실패한 페이지는 마지막 성공 결과를 이전 데이터 표시와 함께 합친다.
+    stale_key_set = breaker.get_failing_set()
+    return {area_item: merge_category_dfs(area_item, latest_category_df_dict, latest_crawled_at_dict, stale_key_set)
+            for area_item in dict.fromkeys(area_key for area_key, _ in due_list)}
+
+
+def get_service_chart_df_by_url_list(area):
+    if area is None:
+        logging.info(f'{area=} 크롤링 미실행!')
+        return None
+
+    return get_service_chart_df_dict([area]).get(area)
+
+
+# # # # # # # # # # # # # # #
+# 백그라운드 크롤러 & 스냅샷
+# # # # # # # # # # # # # # #
+
+
+_companies_lock = threading.Lock()
+
+
+# 크롤러가 스냅샷을 발행할 때 회사 목록 파일을 갱신한다. (크롤러 스레드에서 호출)
+def save_companies_list(area, status_df):
+    with _companies_lock:
+        companies_list_dict = pickle_load_cache_file(COMPANIES_LIST_FILE, dict)
+        old_list = companies_list_dict.get(area, [])
+
+        # 신규 목록 합치기
+        new_set = set(old_list) | set(status_df[get_downdetector_web.NAME])
+        if len(new_set) == len(old_list):
+            return  # 신규 서비스 없음
+
+        companies_list_dict[area] = sorted(new_set, key=lambda x: x.lower())  # 대소문자 구분없이 abc 순으로 정렬
+
+        # 합쳐진 리스트를 다시 파일로 저장
+        with open(COMPANIES_LIST_FILE, 'wb') as f_:
+            pickle.dump(companies_list_dict, f_)
+            logging.info(f'{area} 회사 목록 업데이트 & 파일 저장 완료 - Total services count: {len(new_set)}')
+
+
+@st.cache_resource
+def get_report_history():
+    return report_history.ReportHistory(HISTORY_DIR)
+
+
+# 전체 지역/서비스 대상 급상승 순위 (프로세스당 1개)
+@st.cache_resource
+def get_top_movers():
+    return top_movers.TopMovers(TOP_MOVERS_SIZE)
+
+
+# 스냅샷 발행 후처리 (크롤러 스레드에서 호출)
+def on_status_published(snapshot):
+    save_companies_list(snapshot.area, snapshot.df)
 
-    logging.info(f'{area} status_df 갱신 후 길이: {len(st.session_state.status_df_dict[area])}')
+    # 장기 이력 저장은 페이지를 크롤링할 때 한다. (get_service_chart_df_dict)
+    # 시간/일 단위 집계와 보관 기간 정리는 주기마다 한번씩만 한다.
+    get_report_history().rollup_if_due(snapshot.area, HISTORY_ROLLUP_INTERVAL_MIN * 60)
 
-    # 회사 목록 파일 업데이트
-    new_list = list(st.session_state.status_df_dict[area][get_downdetector_web.NAME])
+    # 새로 알람이 뜬 서비스의 뉴스/번역을 백그라운드에서 미리 가져온다.
+    get_news_prefetcher().on_snapshot(snapshot.area, get_snapshot_alarm_name_list(snapshot))
 
-    # 기존 회사 목록 불러오기
-    # companies_list = pickle_load_cache_file(COMPANIES_LIST_FILE, dict)
+
+# 프로세스당 1개의 크롤러를 띄워서 모든 세션이 공유한다.
+@st.cache_resource
+def get_status_crawler():
+    crawler = status_crawler.StatusCrawler(crawl_func=get_service_chart_df_dict,
+                                           area_list=AREA_LIST,
+                                           interval_sec=CRAWL_TICK_SEC,
+                                           on_publish=on_status_published)
+
+    # 재시작 직후에도 바로 그릴 수 있게 마지막으로 저장된 결과를 stale 스냅샷으로 올린다.
+    category_df_dict, saved_at_dict = load_category_df_dict(AREA_LIST)
+    for (area_item, category_item), df_ in category_df_dict.items():
+        set_latest_category_df(area_item, category_item, df_, saved_at_dict[(area_item, category_item)])
+        get_top_movers().update_page(area_item, category_item, df_, get_downdetector_web.make_values_matrix(df_))
+    for area_item in AREA_LIST:
+        saved_at_list = [saved_at for (area_key, _), saved_at in saved_at_dict.items() if area_key == area_item]
+        if len(saved_at_list) == 0:
+            continue
+        crawler.load_stale_snapshot(area_item, merge_category_dfs(area_item, category_df_dict, saved_at_dict),
+                                    min(saved_at_list))
+
+    crawler.start()
+    return crawler
+
+
+# 스냅샷을 세션에 반영 + 세션의 회사 목록 합치기
+def update_status_and_companies(area, status_df):
+    st.session_state.status_df_dict[area] = status_df
+
+    if status_df is None or len(status_df) == 0:
+        logging.error(f'{area} status_df 갱신 실패!')
+        return False
+
+    logging.info(f'{area} status_df 갱신 후 길이: {len(status_df)}')
+
+    # 회사 목록 업데이트
+    new_list = list(status_df[get_downdetector_web.NAME])
 
     # 신규 목록 합치기
     st.session_state.companies_list_dict[area] = list(set(st.session_state.companies_list_dict.get(area, [])
@@ -314,11 +706,107 @@ def refresh_status_and_save_companies(area):
 
     # logging.info(f'{area} 회사 목록:\n{st.session_state.companies_list_dict[area][:5]} ...')
     logging.info(f'{area} Total services count: {len(st.session_state.companies_list_dict[area])}')
+    return True
+
+
+# 크롤러가 발행한 최신 스냅샷을 세션으로 가져온다. 세션에서 직접 크롤링하지 않는다.
+def load_status_df(area):
+    # 세션상태 방어 코드
+    init_session_state()
+
+    if area is None:
+        logging.info(f'{area=} 스냅샷 로딩 미실행!')
+        st.session_state.status_df_dict[area] = None
+        return None
+
+    crawler = get_status_crawler()
+    snapshot = crawler.get_snapshot(area)
+
+    if snapshot is None:
+        # 앱 기동 직후 첫 크롤링이 아직 안 끝난 경우에만 기다린다.
+        logging.info(f'{area} 스냅샷 없음 - 첫 크롤링 대기')
+        with st.spinner('서비스 상태 업데이트 중...'):
+            snapshot = crawler.wait_for_snapshot(area, timeout=FIRST_CRAWL_TIMEOUT_SEC)
+
+    if snapshot is None:
+        logging.error(f'{area} 스냅샷 로딩 실패!')
+        st.session_state.status_df_dict[area] = None
+        return None
+
+    update_status_and_companies(area, snapshot.df)
+    st.session_state.status_snapshot_dict[area] = snapshot
+    return snapshot.df
 
-    # 합쳐진 리스트를 다시 파일로 저장
-    with open(COMPANIES_LIST_FILE, 'wb') as f_:
-        pickle.dump(st.session_state.companies_list_dict, f_)
-        logging.info(f'{area} 회사 목록 업데이트 & 파일 저장 완료')
+
+# 세션이 가진 것보다 새로운 스냅샷이 발행됐는지 확인
+def has_newer_status_snapshot(area):
+    snapshot = get_status_crawler().get_snapshot(area)
+    return snapshot is not None and snapshot is not st.session_state.status_snapshot_dict.get(area)
+
+
+# stale-while-revalidate
+# 세션의 스냅샷은 비우지 않고 그대로 보여주면서, 오래된 페이지가 있으면 백그라운드 갱신만 요청한다.
+# (max_age_sec 와 페이지별 크롤링 주기 중 긴 쪽이 지난 페이지만 크롤링한다. 조용한 페이지의 backoff 는 그대로 둔다.)
+# 새 스냅샷이 이미 발행돼 있으면 지역 단위로 통째로 교체한다.
+def revalidate_status_df(max_age_sec):
+    # 세션상태 방어 코드
+    init_session_state()
+
+    crawler = get_status_crawler()
+    key_list = [(area_item, category_item) for area_item in st.session_state.status_df_dict if area_item is not None
+                for category_item in CATEGORY_LIST]
+    expedite_list = [key for key in get_crawl_planner().expedite(key_list, max_age_sec)
+                     if get_crawl_breaker().allow(key)]
+    if len(expedite_list) > 0 and not crawler.crawling:
+        crawler.request_refresh()
+
+    for area in list(st.session_state.status_df_dict):
+        if area is None or not has_newer_status_snapshot(area):
+            continue
+
+        snapshot = crawler.get_snapshot(area)
+        logging.info(f'{area} 새 스냅샷으로 교체')
+        update_status_and_companies(area, snapshot.df)
+        st.session_state.status_snapshot_dict[area] = snapshot
+        st.session_state.status_cache.pop(area, None)  # 대시보드 타일 캐시도 같이 교체
+
+
+# 스냅샷 기준 시각과 경과 시간 표시용 문구
+def get_status_age_text(area):
+    snapshot = st.session_state.status_snapshot_dict.get(area)
+    if snapshot is None:
+        return '데이터 없음'
+
+    # 페이지마다 크롤링 주기가 달라서 발행 시각이 아닌 페이지별 크롤링 시각(CRAWLED_AT)으로 표시한다.
+    # 가장 오래된 페이지 기준이고, 이전 데이터로 대체된 페이지는 아래에서 따로 표시한다.
+    oldest_at = newest_at = snapshot.updated_at
+    if get_downdetector_web.CRAWLED_AT in snapshot.df.columns:
+        crawled_at_sr = snapshot.df[get_downdetector_web.CRAWLED_AT]
+        if get_downdetector_web.STALE in snapshot.df.columns and not snapshot.df[get_downdetector_web.STALE].all():
+            crawled_at_sr = crawled_at_sr[~snapshot.df[get_downdetector_web.STALE]]
+        if crawled_at_sr.notna().any():
+            oldest_at, newest_at = crawled_at_sr.min(), crawled_at_sr.max()
+
+    kst = pytz.timezone('Asia/Seoul')
+    oldest_time = datetime.fromtimestamp(oldest_at, kst).strftime('%Y-%m-%d %H:%M:%S')
+    age_min = int((time.time() - oldest_at) / 60)
+    newest_age_min = int((time.time() - newest_at) / 60)
+
+    if newest_age_min < age_min:
+        age_text = f'{oldest_time} ({newest_age_min}~{age_min}분 전)'
+    else:
+        age_text = f'{oldest_time} ({age_min}분 전)'
+    if snapshot.stale:
+        age_text += ' ⚠️ 이전 데이터'
+    elif get_downdetector_web.STALE in snapshot.df.columns and snapshot.df[get_downdetector_web.STALE].any():
+        # 일부 카테고리만 크롤링에 실패해서 이전 결과를 쓰는 경우
+        stale_df = snapshot.df[snapshot.df[get_downdetector_web.STALE]]
+        stale_category_list = sorted(set(stale_df[get_downdetector_web.CATEGORY].astype(str)))
+        stale_min = int((time.time() - stale_df[get_downdetector_web.CRAWLED_AT].min()) / 60)
+        age_text += f' ⚠️ 이전 데이터 유지({", ".join(stale_category_list)} - {stale_min}분 전)'
+    if get_status_crawler().crawling:
+        age_text += ' 🔄 갱신 중'
+    return age_text
 
 
 def get_service_chart_mapdf(area, service_name=None, need_map=False):
@@ -327,12 +815,12 @@ def get_service_chart_mapdf(area, service_name=None, need_map=False):
 
     # 최초 로딩 시 또는 service_name None일 경우
     if st.session_state.status_df_dict.get(area) is None or service_name is None:
-        logging.info(f'최초 로딩으로 예상 - 서비스 상태 크롤링 시작 {area=} {service_name=}')
-        refresh_status_and_save_companies(area)
+        logging.info(f'최초 로딩으로 예상 - 서비스 상태 스냅샷 로딩 {area=} {service_name=}')
+        load_status_df(area)
 
-    # 단순 크롤링 목적의 호출일 경우
+    # 단순 스냅샷 로딩 목적의 호출일 경우
     if service_name is None:
-        logging.info(f'크롤링 종료 - {area=}')
+        logging.info(f'스냅샷 로딩 종료 - {area=}')
         return None, None, None
 
     # 크롤링에 실패했을 경우
@@ -340,19 +828,45 @@ def get_service_chart_mapdf(area, service_name=None, need_map=False):
         logging.error(f'서비스 상태 크롤링 실패!!! {area=} {service_name=}')
         return None, None, None
 
-    for i, row in st.session_state.status_df_dict[area].iterrows():
-        if row[get_downdetector_web.NAME].upper() == service_name.upper() \
-                and row[get_downdetector_web.AREA].upper() == area.upper():  # 대소문자 구분 없이 이름/지역 일치 찾음.
-            # 서비스를 찾으면 클래스, 리포트 리스트, 지도를 리턴함.
-            if row[get_downdetector_web.VALUES] is None:
-                logging.info(f'{area} {service_name} 의 data_values 없음!')
-                data_values = None
-            else:
-                data_values = [int(x) for x in row[get_downdetector_web.VALUES].strip('[]').split(', ')]
-            return row[get_downdetector_web.CLASS], data_values, None
+    # 스냅샷의 해시 인덱스로 대소문자 구분 없이 이름/지역 일치 찾음.
+    snapshot = st.session_state.status_snapshot_dict[area]
+    row = snapshot.index.get((area.casefold(), service_name.casefold()))
 
     # 서비스를 못찾았을 경우
-    return None, None, None
+    if row is None:
+        return None, None, None
+
+    # 서비스를 찾으면 클래스, 리포트 배열(스냅샷 행렬의 행 view), 지도를 리턴함.
+    return snapshot.df[get_downdetector_web.CLASS].iat[row], snapshot.values[row], None
+
+
+# 서비스의 장기 리포트 이력 조회. 리턴: (리포트 수 배열 - 없는 구간은 NaN, 포인트 간격(분))
+# 기간이 길면 원본 대신 시간/일 단위 집계(구간 최대값)에서 읽는다.
+def get_report_history_values(area, service_name, hours, max_points=report_history.MAX_QUERY_POINTS):
+    end_ts = time.time()
+    _, values, step_sec = get_report_history().query(area, service_name, end_ts - hours * 3600, end_ts,
+                                                     max_points=max_points)
+    return values, step_sec // 60
+
+
+# 스냅샷의 자체 이상 감지 등급 (없으면 None)
+def get_service_anomaly(area, service_name):
+    snapshot = st.session_state.status_snapshot_dict.get(area)
+    if snapshot is None or get_downdetector_web.ANOMALY not in snapshot.df.columns:
+        return None
+
+    row = snapshot.index.get((area.casefold(), service_name.casefold()))
+    if row is None:
+        return None
+    return snapshot.df[get_downdetector_web.ANOMALY].iat[row]
+
+
+# 같이 급증한 서비스 묶음 목록 (outage_cluster.OutageCluster 리스트)
+def get_outage_cluster_list(area):
+    snapshot = st.session_state.status_snapshot_dict.get(area)
+    if snapshot is None or snapshot.cluster_list is None:
+        return []
+    return snapshot.cluster_list
 
 
 # 현재 알람이 뜬 서비스 목록을 가져오는 함수
@@ -361,22 +875,21 @@ def get_current_alarm_service_list(area):
     init_session_state()
 
     if st.session_state.status_df_dict.get(area) is None:
-        logging.info('현재 알람 상태 없어서 크롤링 시작')
-        get_service_chart_mapdf(area)  # 현재 값이 없을 경우 강제 크롤링 1회 수행.
+        logging.info('현재 알람 상태 없어서 스냅샷 로딩')
+        get_service_chart_mapdf(area)  # 현재 값이 없을 경우 최신 스냅샷을 가져온다.
 
     if st.session_state.status_df_dict.get(area) is None:
         # 크롤링에 실패했을 경우.
         logging.error(f'크롤링 실패하여 현재 알람 상태 확인 불가!!!')
         return []
 
-    alarm_list = []
-    for i, row in st.session_state.status_df_dict[area].iterrows():
-        # 해당 지역의 Red 알람이면서 게임/금융 알람이 아닌 것.
-        if row[get_downdetector_web.CLASS] == get_downdetector_web.DANGER \
-                and row[get_downdetector_web.AREA].upper() == area.upper() \
-                and row[get_downdetector_web.CATEGORY] != get_downdetector_web.GAMING \
-                and row[get_downdetector_web.CATEGORY] != get_downdetector_web.FINANCE:
-            alarm_list.append(row[get_downdetector_web.NAME])
+    # 해당 지역의 Red 알람이면서 게임/금융 알람이 아닌 것. (마스크로 한번에 계산)
+    df_ = st.session_state.status_df_dict[area]
+    alarm_mask = ((df_[get_downdetector_web.CLASS] == get_downdetector_web.DANGER)
+                  & (df_[get_downdetector_web.AREA].map(str.upper) == area.upper())
+                  & ~df_[get_downdetector_web.CATEGORY].isin([get_downdetector_web.GAMING,
+                                                              get_downdetector_web.FINANCE]))
+    alarm_list = df_.loc[alarm_mask, get_downdetector_web.NAME].tolist()
 
     logging.info(f'{area}의 Red 알람 서비스 목록: {alarm_list}')
 
@@ -385,13 +898,104 @@ def get_current_alarm_service_list(area):
     return alarm_list
 
 
-def init_status_df():
-    logging.info('status_df_dict 초기화!')
-    st.session_state.status_df_dict = dict()
-    get_downdetector_web.get_downdetector_df.clear()
+# 여러 지역의 알람 서비스 뉴스를 한번에 동시 검색한다.
+# 리턴: 서비스/지역 컬럼이 붙은 뉴스 df (최신순, 같은 기사는 1번만)
+def get_alarm_news_df(area_list, search_hour=None, and_keyword_list=None):
+    job_list = [(area_item, name) for area_item in area_list for name in get_current_alarm_service_list(area_item)]
+    job_list = list(dict.fromkeys(job_list))
+    if len(job_list) == 0:
+        return pd.DataFrame(columns=['서비스', '지역'] + news_client.NEWS_COLUMN_LIST)
+
+    def fetch_service_news(area_item, name):
+        rss_text = get_news_client().fetch_search(news_client.build_news_query(name, and_keyword_list), search_hour)
+        if rss_text is None:
+            return None
+        return news_client.parse_search_rss(rss_text, name).assign(서비스=name, 지역=area_item)
 
+    logging.info(f'알람 서비스 뉴스 동시 검색 시작 : {len(job_list)}개 서비스')
+    start_time = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=min(NEWS_BATCH_MAX_WORKERS, len(job_list))) as executor:
+        future_list = [executor.submit(fetch_service_news, *job) for job in job_list]
+
+    df_list = []
+    for job, future in zip(job_list, future_list):
+        try:
+            df_ = future.result()
+        except Exception as e:
+            logging.error(f'{job} 뉴스 검색 에러 - {e}')
+            continue
+        if df_ is not None and len(df_) > 0:
+            df_list.append(df_)
+
+    logging.info(f'알람 서비스 뉴스 동시 검색 종료 : {time.monotonic() - start_time:.1f}초, '
+                 f'{len(df_list)}개 서비스 뉴스 있음')
+    if len(df_list) == 0:
+        return pd.DataFrame(columns=['서비스', '지역'] + news_client.NEWS_COLUMN_LIST)
+
+    news_df = pd.concat(df_list, ignore_index=True)[['서비스', '지역'] + news_client.NEWS_COLUMN_LIST]
+    return (news_df.drop_duplicates(subset='링크')
+            .sort_values('발행시간', ascending=False, kind='stable')
+            .reset_index(drop=True))
+
+
+# 서비스 목록이 바뀔 때만 오토마톤을 다시 만든다.
+@st.cache_resource(max_entries=2)
+def get_service_matcher(name_tuple):
+    return service_matcher.ServiceMatcher(name_tuple, SERVICE_ALIAS_DICT)
+
+
+# 광역 뉴스 피드 몇 개를 가져와서 제목마다 전체 서비스 목록과 역매칭한다.
+# 리턴: 서비스/지역 컬럼이 붙은 뉴스 df (기사 1건이 여러 서비스에 매칭되면 서비스마다 1행, 최신순)
+def get_broad_news_df(search_hour=None):
+    column_list = ['서비스', '지역'] + news_client.NEWS_COLUMN_LIST
+
+    area_list_dict = dict()  # 서비스명 -> 지역 리스트
+    for area_item, name_list in st.session_state.companies_list_dict.items():
+        for name in name_list:
+            area_list_dict.setdefault(name, []).append(area_item)
+    if len(area_list_dict) == 0:
+        return pd.DataFrame(columns=column_list)
+
+    matcher = get_service_matcher(tuple(sorted(area_list_dict)))
+
+    with ThreadPoolExecutor(max_workers=len(BROAD_NEWS_QUERY_LIST)) as executor:
+        rss_text_list = list(executor.map(lambda query: get_news_client().fetch_search(query, search_hour),
+                                          BROAD_NEWS_QUERY_LIST))
+
+    df_list = []
+    for query, rss_text in zip(BROAD_NEWS_QUERY_LIST, rss_text_list):
+        if rss_text is None:
+            logging.error(f'광역 뉴스 피드 가져오기 실패 - {query}')
+            continue
+        try:
+            df_list.append(news_client.parse_search_rss(rss_text))
+        except Exception as e:
+            logging.error(f'광역 뉴스 피드 파싱 실패 - {query} - {e}')
+    if len(df_list) == 0:
+        return pd.DataFrame(columns=column_list)
+
+    news_df = pd.concat(df_list, ignore_index=True).drop_duplicates(subset='링크')
+
+    row_list = []
+    for row in news_df.itertuples(index=False):
+        for name in sorted(matcher.match(row.제목)):
+            row_list.append([name, ', '.join(area_list_dict[name])] + list(row))
+
+    logging.info(f'광역 뉴스 {len(news_df)}건 -> 서비스 매칭 {len(row_list)}건')
+    return (pd.DataFrame(row_list, columns=column_list)
+            .sort_values('발행시간', ascending=False, kind='stable')
+            .reset_index(drop=True))
+
+
+def get_status_color(name, status, area=None):
+    # 자체 이상 감지 등급이 다운디텍터 등급보다 높으면 그 등급으로 먼저 알린다.
+    anomaly = get_service_anomaly(area, name) if area is not None else None
+    escalated = (anomaly is not None
+                 and get_downdetector_web.get_impact_order(anomaly) > get_downdetector_web.get_impact_order(status))
+    if escalated:
+        status = anomaly
 
-def get_status_color(name, status):
     if status is None or status == get_downdetector_web.SUCCESS:
         color = 'green'
         color_code = GREEN
@@ -407,5 +1011,8 @@ def get_status_color(name, status):
         icon = '☠︎'
         # st.toast(f'**{name}** 서비스 문제 발생!', icon="🚨")
 
+    if escalated:
+        icon = '⚡'  # 다운디텍터보다 먼저 감지한 급증
+
     return color, color_code, icon
 
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+import get_downdetector_web
+import anomaly_detector
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# (지역, 카테고리) 페이지별 적응형 크롤링 주기
+# # # # # # # # # # # # # # #
+
+# 페이지를 크롤링할 때마다 결과를 보고 다음 주기를 정한다.
+# - 감시 중인 서비스에 알람(다운디텍터 WARNING 이상 또는 자체 이상 감지 DANGER) : min_interval
+# - 다른 서비스에 알람이 있거나, 감시 중인 서비스가 있는 페이지 : base_interval
+#   (자체 이상 감지 WARNING 은 잡음에서도 가끔 나와서 주기를 당기는 데는 쓰지 않는다.)
+# - 그 외 조용한 페이지 : 이전 주기 x backoff (max_interval 까지)
+# 같은 시점에 여러 페이지가 밀려 있으면 주기가 짧은(뜨거운) 페이지부터 크롤링한다.
+
+
+class CrawlPlanner:
+    def __init__(self, min_interval_sec, base_interval_sec, max_interval_sec, backoff=2.0):
+        self.min_interval_sec = min_interval_sec
+        self.base_interval_sec = base_interval_sec
+        self.max_interval_sec = max_interval_sec
+        self.backoff = backoff
+
+        self._lock = threading.Lock()
+        self._interval_dict = dict()  # 페이지 키 -> 현재 주기(초)
+        self._next_due_dict = dict()  # 페이지 키 -> 다음 크롤링 시각 (epoch 초)
+        self._crawled_at_dict = dict()  # 페이지 키 -> 마지막 크롤링 시각 (epoch 초)
+
+    # 지금 크롤링할 페이지 목록 (뜨거운 페이지 먼저). 처음 보는 페이지는 바로 크롤링한다.
+    def get_due_list(self, key_list, now=None):
+        now = now or time.time()
+        with self._lock:
+            due_list = [key for key in key_list if self._next_due_dict.get(key, 0) <= now]
+            due_list.sort(key=lambda x: (self._interval_dict.get(x, 0), self._next_due_dict.get(x, 0)))
+        return due_list
+
+    # 성공한 페이지 크롤링 결과로 다음 주기를 정한다. 리턴: 새 주기(초)
+    # 실패한 페이지는 여기서 다루지 않는다. 재시도 시각은 서킷 브레이커(circuit_breaker.py)가 정한다.
+    # values_matrix : 크롤링할 때 만든 페이지의 서비스 x 포인트 리포트 수 행렬 (df 의 행 순서와 같음)
+    def update(self, key, df_, values_matrix, watch_set, now=None):
+        now = now or time.time()
+
+        with self._lock:
+            prev_interval = self._interval_dict.get(key, self.base_interval_sec)
+
+        class_sr = df_[get_downdetector_web.CLASS].astype(get_downdetector_web.CLASS_DTYPE)
+        level_codes = class_sr.cat.codes.to_numpy()
+        _, _, anomaly_codes = anomaly_detector.detect_anomalies(values_matrix)
+
+        alarm_mask = (level_codes >= 1) | (anomaly_codes >= 2)
+        watch_mask = df_[get_downdetector_web.NAME].isin(watch_set).to_numpy()
+
+        if (alarm_mask & watch_mask).any():
+            interval = self.min_interval_sec
+        elif alarm_mask.any() or watch_mask.any():
+            interval = self.base_interval_sec
+        else:
+            interval = min(prev_interval * self.backoff, self.max_interval_sec)
+
+        with self._lock:
+            self._interval_dict[key] = interval
+            self._next_due_dict[key] = now + interval
+            self._crawled_at_dict[key] = now
+
+        if interval != prev_interval:
+            logging.info(f'{key} 크롤링 주기 변경 - {prev_interval:.0f}초 -> {interval:.0f}초')
+        return interval
+
+
+    # 세션 새로고침 : 마지막 크롤링이 max(max_age_sec, 현재 주기) 보다 오래된 페이지를 바로 크롤링하게 한다.
+    # 조용해서 주기가 max_age_sec 보다 늘어난 페이지는 당기지 않는다. (대시보드를 띄워둬도 backoff 유지)
+    # 리턴: 지금 크롤링할 페이지 목록 (처음 보는 페이지 제외)
+    def expedite(self, key_list, max_age_sec, now=None):
+        now = now or time.time()
+        with self._lock:
+            expedite_list = [key for key in key_list if key in self._crawled_at_dict
+                             and now - self._crawled_at_dict[key] >= max(max_age_sec, self._interval_dict[key])]
+            for key in expedite_list:
+                self._next_due_dict[key] = min(self._next_due_dict[key], now)
+
+        if len(expedite_list) > 0:
+            logging.info(f'{max_age_sec}초 이상 지난 페이지 크롤링 요청 - {expedite_list}')
+        return expedite_list
+
+
+# # # # # # # # # # # # # # #
+# 세션들이 보고 있는 감시 서비스 목록
+# # # # # # # # # # # # # # #
+
+
+# 백그라운드 크롤러는 세션 상태를 볼 수 없으므로, 세션들이 화면을 그릴 때마다 감시 목록을 등록해둔다.
+# expire_sec 동안 다시 등록되지 않은 서비스(닫힌 세션)는 빠진다.
+class WatchRegistry:
+    def __init__(self, expire_sec):
+        self.expire_sec = expire_sec
+        self._lock = threading.Lock()
+        self._seen_dict = dict()  # (지역, 서비스명) -> 마지막 등록 시각
+
+    def register(self, area, name_list):
+        now = time.time()
+        with self._lock:
+            for name in name_list:
+                self._seen_dict[(area, name)] = now
+
+    def get_set(self, area):
+        expire_time = time.time() - self.expire_sec
+        with self._lock:
+            return {name for (area_key, name), seen_at in self._seen_dict.items()
+                    if area_key == area and seen_at >= expire_time}
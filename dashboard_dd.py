@@ -1,6 +1,7 @@
 import streamlit as st
 import logging
 import config
+import get_downdetector_web
 import time
 import pandas as pd
 import pytz
@@ -19,12 +20,17 @@ config.init_session_state()
 
 
 # 리포트 차트 그리는 함수
-def display_chart(chart_list, color_code, chart_height=50, label_tick=False):
-    if chart_list is None or chart_list == []:
-        chart_list = [0] * 96
+# step_min : 포인트 간격(분). 값이 NaN 인 구간(이력 없음)은 빼고 그린다.
+def display_chart(chart_list, color_code, chart_height=50, label_tick=False, step_min=15):
+    if chart_list is None or len(chart_list) == 0:
+        chart_list = [0] * get_downdetector_web.SPARKLINE_POINTS
 
+    num_points = len(chart_list)
     chart_data = pd.DataFrame(chart_list, columns=["Report Count"]).dropna().astype('int').reset_index()
-    chart_data['Time'] = chart_data['index'].apply(lambda x: ((x - 96) * 15) / 60)
+    if len(chart_data) == 0:
+        # 이력이 하나도 없으면 0으로 그린다.
+        chart_data = pd.DataFrame([0] * num_points, columns=["Report Count"]).reset_index()
+    chart_data['Time'] = chart_data['index'].apply(lambda x: ((x - num_points) * step_min) / 60)
     # st.line_chart(chart_data, color=color_code, height=80)
 
     # Altair를 사용한 라인 차트 생성
@@ -43,8 +49,8 @@ def display_chart(chart_list, color_code, chart_height=50, label_tick=False):
         return
 
     # 최대값이 있을 경우 화면에 표시해준다.
-    # 최대값 인덱스 확인
-    max_index = chart_data['Report Count'].idxmax()
+    # 최대값 인덱스 확인 (빈 구간을 뺀 뒤라 행 라벨이 아닌 원래 위치 'index' 컬럼 값으로 맞춘다)
+    max_index = chart_data.loc[chart_data['Report Count'].idxmax(), 'index']
 
     color_name = 'red'
     f_size = 20
@@ -84,6 +90,34 @@ def click_button(area, selected_service_name):
     st.session_state.dashboard_button_clicked = True
 
 
+# 연관 장애 묶음 표시 함수
+def display_outage_clusters(cluster_list, max_names=20):
+    for cluster in cluster_list:
+        minutes_ago = (get_downdetector_web.SPARKLINE_POINTS - cluster.onset_index) * 15
+        root_text = f'**{cluster.root}**' if cluster.root_is_provider else f'**{cluster.root}** (최초 급증)'
+        name_text = ', '.join(cluster.name_list[:max_names])
+        if len(cluster.name_list) > max_names:
+            name_text += f' 외 {len(cluster.name_list) - max_names}개'
+
+        st.warning(f'🔗 연관 장애 추정 원인: {root_text} - {len(cluster.name_list)}개 서비스, '
+                   f'약 {minutes_ago}분 전 시작  \n{name_text}')
+
+
+# 급상승 서비스 순위 표시 함수 (감시 목록과 상관없이 전체 서비스 대상)
+def display_top_movers(area):
+    mover_list = config.get_top_movers().get_top(area)
+    if len(mover_list) == 0:
+        return
+
+    with st.expander(f'🚀 급상승 서비스 Top {len(mover_list)}'):
+        st.dataframe(pd.DataFrame({'서비스': [mover.name for mover in mover_list],
+                                   '카테고리': [mover.category for mover in mover_list],
+                                   '최근 1시간': [round(mover.recent) for mover in mover_list],
+                                   '직전 2시간': [round(mover.base) for mover in mover_list],
+                                   '증가율(%)': [round(mover.growth * 100) for mover in mover_list]}),
+                     hide_index=True, use_container_width=True)
+
+
 # 대시보드 구성 함수
 def display_dashboard(area):
     # 최초 캐시 세션 생성
@@ -93,9 +127,23 @@ def display_dashboard(area):
     target_set = st.session_state.target_service_set_dict[area]
     logging.info(f'{area} 대시보드 구성 시작: {len(target_set)}개 서비스')
 
+    # 감시 중인 서비스가 있는 페이지는 백그라운드 크롤러가 더 자주 크롤링한다.
+    config.register_watch_list(area, target_set)
+
     # 현재 알람 크롤링 + 레드 알람 목록 가져옴.
     alarm_list = config.get_current_alarm_service_list(area=area)
-    alarm_list.sort(key=lambda x: x.lower())  # abc 순으로 정렬
+
+    # 같이 급증한 묶음을 먼저 보여주고, 알람 타일도 묶음끼리 모아서 abc 순으로 정렬
+    cluster_list = config.get_outage_cluster_list(area)
+    display_outage_clusters(cluster_list)
+
+    display_top_movers(area)
+
+    cluster_rank_dict = dict()
+    for rank, cluster in enumerate(cluster_list):
+        for name in cluster.name_list:
+            cluster_rank_dict.setdefault(name, rank)
+    alarm_list.sort(key=lambda x: (cluster_rank_dict.get(x, len(cluster_list)), x.lower()))
 
     target_list = list(target_set)
     target_list_filtered = [item for item in target_list if item not in alarm_list]
@@ -103,6 +151,9 @@ def display_dashboard(area):
 
     all_target_list = alarm_list + target_list_filtered
 
+    # 버튼 id용 회사 목록 순번 (리스트 index() 대신 해시 조회)
+    index_code_dict = {name: idx for idx, name in enumerate(st.session_state.companies_list_dict[area])}
+
     dashboard_columns = st.columns(st.session_state.num_dashboard_columns)
 
     for idx, item in enumerate(all_target_list):
@@ -121,11 +172,11 @@ def display_dashboard(area):
 
             with st.container():
                 # 상태
-                _, color_code, _ = config.get_status_color(item, status)
+                _, color_code, _ = config.get_status_color(item, status, area=area)
 
                 # print(st.session_state.companies_list_dict[area])
-                if item in st.session_state.companies_list_dict[area]:
-                    index_code = st.session_state.companies_list_dict[area].index(item)
+                if item in index_code_dict:
+                    index_code = index_code_dict[item]
                 else:
                     index_code = 'None'
                     logging.error(f'{item}이 회사 목록에 없음!!!')
@@ -163,6 +214,15 @@ def display_dashboard(area):
     with st.expander('Raw Data'):
         st.write(st.session_state.status_df_dict[area])
 
+        # 페이지별 크롤링 전송량 / 데이터 확보 시간
+        st.write(get_downdetector_web.get_page_stats_df())
+
+        # 호스트별 요청 제한 대기열 / 대기 시간
+        st.write(config.get_rate_limiter().get_stats_df())
+
+        # 크롤링에 실패 중인 페이지와 재시도까지 남은 시간
+        st.write(config.get_crawl_breaker().get_stats_df())
+
     logging.info(f'{area} 대시보드 구성 완료.\n')
 
 
@@ -222,6 +282,9 @@ def make_all_dashboard_tabs(area, icon='', image_path=None):
                                                                        format='%d', min_value=3)
     st.session_state.display_chart = st.sidebar.checkbox('리포트 차트 보기', value=st.session_state.display_chart)
 
+    # 지난 스냅샷을 그대로 보여주고, 오래됐으면 백그라운드 갱신만 요청한다.
+    config.revalidate_status_df(st.session_state.dashboard_refresh_timer * 60)
+
     # 메인 페이지
     col1, col2 = st.columns([4, 1])
     with col1:
@@ -294,6 +357,7 @@ def make_all_dashboard_tabs(area, icon='', image_path=None):
     kst = pytz.timezone('Asia/Seoul')
     current_time = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
     st.sidebar.write(f'최종 업데이트 - {current_time}')
+    st.sidebar.write(f'데이터 기준 - {config.get_status_age_text(area)}')
     logging.info(f'대시보드 업데이트 완료 : {current_time}')
 
     # 다음 업데이트 타이머 표기
@@ -327,10 +391,13 @@ def make_all_dashboard_tabs(area, icon='', image_path=None):
             elif area == 'JP':
                 st.switch_page(config.DASHBOARD_US_PAGE)
 
+        # 백그라운드 갱신이 끝나서 새 스냅샷이 나오면 바로 교체해서 다시 그린다.
+        if config.has_newer_status_snapshot(area):
+            logging.info(f'{area} 새 스냅샷 도착 - 다시 그리기')
+            st.rerun()
+
     # 타이머 완료 메시지
     timer_placeholder.markdown("⏰ 카운트다운 완료! 서비스 상태 재검색!")
-    st.session_state.status_cache = dict()
 
     logging.info('새로 고침!!!')
-    config.init_status_df()  # 서비스 상태 초기화
-    st.rerun()
+    st.rerun()  # 다시 그리면서 스냅샷 갱신을 요청한다.
@@ -3,19 +3,23 @@
 # pip install undetected-chromedriver
 # pip install selenium_stealth
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
-from selenium_stealth import stealth
+import numpy as np
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+import os
 import sys
+import json
+import time
+import signal
+import queue
+import threading
 import logging
-import matplotlib.pyplot as plt
+
+# selenium, webdriver_manager, selenium_stealth, matplotlib 은 무거워서
+# 실제로 크롬을 띄우거나 차트를 그릴 때만 import 한다.
 
 
 # 필드명
@@ -24,6 +28,13 @@ VALUES = "Values"
 CLASS = "Class"
 AREA = "Area"
 CATEGORY = "Category"
+ANOMALY = "Anomaly"  # 자체 이상 감지 등급 (CLASS 와 같은 값/타입)
+ANOMALY_SCORE = "AnomalyScore"  # 자체 이상 감지 점수 (robust z)
+CRAWLED_AT = "CrawledAt"  # 해당 행을 크롤링한 시각 (epoch 초)
+STALE = "Stale"  # 이번 크롤링에 실패해서 마지막 성공 결과를 대신 쓴 행 여부
+
+# 스파크라인 포인트 수 (15분 간격 24시간)
+SPARKLINE_POINTS = 96
 
 # 클래스명
 DANGER = "danger"
@@ -37,6 +48,100 @@ SOCIAL_MEDIA = 'social-media'
 FINANCE = 'finance'
 GAMING = 'gaming'
 
+# 반복되는 문자열 컬럼은 category 타입으로 저장한다.
+# 클래스는 영향도 순서로 정렬해 두어서 코드값 + 1 = 영향도 등급(get_impact_order)이 되게 한다.
+CLASS_DTYPE = pd.CategoricalDtype([SUCCESS, WARNING, DANGER], ordered=True)
+CATEGORY_DTYPE = pd.CategoricalDtype([TELECOM, ONLINE_SERVICE, SOCIAL_MEDIA, FINANCE, GAMING])
+
+# 크롤링 엔진 설정
+# True면 HTTP + lxml 파서로 먼저 시도하고, 차단/실패 시에만 셀레니움(크롬)으로 크롤링한다.
+USE_HTTP_ENGINE = True
+HTTP_TIMEOUT_SEC = 15
+HTTP_POOL_SIZE = 10
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# 서비스 카드(.caption), 서비스명(h5), 리포트 차트(.sparkline) 선택용 XPath
+CAPTION_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' caption ')]"
+SPARKLINE_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' sparkline ')]"
+
+# 셀레니움 추출 방식
+# 'script' : execute_script 1회로 전체 서비스 추출
+# 'page_source' : page_source를 받아서 lxml로 파싱
+# 'element' : 서비스마다 find_element 호출 (기존 방식, 느림)
+SELENIUM_EXTRACT_MODE = 'script'
+
+# 크롬 드라이버 풀 크기 (동시에 띄울 수 있는 최대 크롬 수)
+DRIVER_POOL_SIZE = 3
+DRIVER_ACQUIRE_TIMEOUT_SEC = 120
+
+# 크롬 드라이버 수명 관리
+DRIVER_MAX_PAGES = 50  # 이 페이지 수만큼 크롤링하면 새 크롬으로 교체
+DRIVER_MAX_RSS_MB = 1024  # 크롬 프로세스 트리 메모리(RSS)가 이 값을 넘으면 교체 (리눅스만)
+DRIVER_WATCHDOG_INTERVAL_SEC = 10  # 멈춘 크롬 확인 주기 (기준 시간 DRIVER_HANG_TIMEOUT_SEC 는 아래 타임아웃 설정 참고)
+DRIVER_SPARE_COUNT = 1  # 교체용으로 미리 띄워둘 예비 크롬 수
+
+# 스크래핑 전용 브라우저 프로필
+# 이미지, 폰트, 스타일시트, 광고/트래커를 CDP로 차단하고, DOM만 준비되면 바로 추출한다.
+SCRAPING_PROFILE = True
+PAGE_LOAD_STRATEGY = 'eager'  # 'eager' : DOMContentLoaded 까지만 대기, 'none' : 바로 리턴
+PAGE_LOAD_TIMEOUT_SEC = 60  # driver.get 최대 대기 시간
+PAGE_DATA_TIMEOUT_SEC = 60  # 페이지 로딩 후 서비스 목록이 DOM에 들어올 때까지 최대 대기 시간
+
+# 한 페이지를 이 시간 넘게 붙잡고 있으면 멈춘 것으로 보고 강제 종료한다.
+# 정상 경로(페이지 로딩 + 데이터 대기 + 추출)의 타임아웃이 먼저 동작하도록 그 합보다 길게 잡는다.
+DRIVER_EXTRACT_MARGIN_SEC = 60
+DRIVER_HANG_TIMEOUT_SEC = PAGE_LOAD_TIMEOUT_SEC + PAGE_DATA_TIMEOUT_SEC + DRIVER_EXTRACT_MARGIN_SEC
+
+BLOCKED_URL_PATTERNS = [
+    # 이미지/미디어
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.mp4', '*.webm',
+    # 폰트/스타일시트
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.css',
+    # 광고/트래커
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*adservice.google.*', '*amazon-adsystem.com*', '*facebook.net*', '*hotjar.com*', '*quantserve.com*',
+    '*scorecardresearch.com*', '*taboola.com*', '*outbrain.com*', '*criteo.*', '*adnxs.com*',
+    '*onetrust.com*', '*cookielaw.org*',
+]
+
+# 페이지 전송량(바이트) 계산 - navigation + resource 항목의 transferSize 합계
+PAGE_TRANSFER_SIZE_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce(function (total, entry) { return total + (entry.transferSize || 0); }, 0);
+"""
+
+# 페이지별 최근 크롤링 측정값 {url: {...}}
+PAGE_STATS_DICT = dict()
+_page_stats_lock = threading.Lock()
+
+# 앱 시작 시 크롬을 백그라운드에서 미리 띄워둘지 여부 (첫 페이지 렌더링은 기다리지 않는다)
+# USE_HTTP_ENGINE 이 True 면 크롬은 폴백용이라 미리 띄우지 않는다.
+DRIVER_WARM_UP_ON_START = True
+
+# 모든 .caption의 서비스명, data-values, 스파크라인 클래스를 JSON 배열로 한번에 받는다.
+# 서비스별로 try/catch 해서 일부가 깨져도 나머지는 그대로 받는다.
+EXTRACT_SERVICES_SCRIPT = """
+const result = [];
+document.querySelectorAll('.caption').forEach(function (caption) {
+    try {
+        const sparkline = caption.querySelector('.sparkline');
+        result.push({
+            name: caption.querySelector('h5').innerText,
+            values: sparkline.getAttribute('data-values'),
+            classes: sparkline.getAttribute('class') || ''
+        });
+    } catch (e) {
+        result.push({error: String(e), html: caption.outerHTML.slice(0, 200)});
+    }
+});
+return JSON.stringify(result);
+"""
+
 
 # 로깅 설정
 # logging.basicConfig(level=logging.INFO)
@@ -45,24 +150,62 @@ GAMING = 'gaming'
 # # # # # # # # # # # # # # # # # # # #
 
 
-logging.info('CHROME_DRIVER 초기화 시작')
-
-
+# 크롬 드라이버 경로 확인 (버전 체크/다운로드는 프로세스당 1회만 한다)
 @st.cache_resource
-def get_driver():
+def get_chrome_driver_path():
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.os_manager import ChromeType
+
     logging.info(f'{sys.platform=}')
     if sys.platform == 'win32' or sys.platform == 'darwin':
         # 윈도우 또는 맥일 경우
-        new_driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()),
-            options=options
-        )
+        return ChromeDriverManager().install()
     else:
         # 리눅스 서버일 경우
-        new_driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()),
-            options=options,
-        )
+        return ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+
+
+# Selenium 설정
+def get_chrome_options():
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("start-maximized")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--headless")
+    # options.add_argument("--headless=new")  # 최신 헤드리스 모드를 사용
+
+    # options.add_argument("--no-sandbox")
+    # options.add_argument("--disable-dev-shm-usage")
+
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # verify=False 관련 설정
+    options.add_argument('--ignore-certificate-errors')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+
+    if SCRAPING_PROFILE:
+        options.page_load_strategy = PAGE_LOAD_STRATEGY
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.fonts': 2,
+        })
+
+    return options
+
+
+def create_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium_stealth import stealth
+
+    new_driver = webdriver.Chrome(
+        service=ChromeService(get_chrome_driver_path()),
+        options=get_chrome_options(),
+    )
 
     stealth(new_driver,
             languages=["en-US", "en"],
@@ -73,36 +216,258 @@ def get_driver():
             fix_hairline=True,
             )
 
+    # 불필요한 리소스는 네트워크 단에서 차단한다.
+    if SCRAPING_PROFILE:
+        try:
+            new_driver.execute_cdp_cmd('Network.enable', {})
+            new_driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logging.error(f'리소스 차단 설정 실패 - 그대로 진행 - {e}')
+
     return new_driver
 
 
-# Selenium 설정
-options = Options()
-options.add_argument("start-maximized")
-options.add_argument("--disable-gpu")
-options.add_argument("--headless")
-# options.add_argument("--headless=new")  # 최신 헤드리스 모드를 사용
+# # # # # # # # # # # # # # #
+# 크롬 프로세스 관리 (리눅스 /proc 기반)
+# # # # # # # # # # # # # # #
 
-# options.add_argument("--no-sandbox")
-# options.add_argument("--disable-dev-shm-usage")
 
-options.add_experimental_option("excludeSwitches", ["enable-automation"])
-options.add_experimental_option('useAutomationExtension', False)
+def get_driver_pid(driver):
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None
 
-# verify=False 관련 설정
-options.add_argument('--ignore-certificate-errors')
-options.add_argument('--disable-web-security')
-options.add_argument('--allow-running-insecure-content')
 
+# chromedriver 프로세스와 그 하위(크롬 브라우저, 렌더러 등) 프로세스 pid 목록
+def get_process_tree_pid_list(root_pid):
+    if root_pid is None or not os.path.isdir('/proc'):
+        return [] if root_pid is None else [root_pid]
 
-# # # # # # # # # #
-# 드라이버 초기화
-# # # # # # # # # #
+    children_dict = dict()
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f_:
+                # 'pid (comm) state ppid ...' - comm에 공백/괄호가 있을 수 있어서 마지막 ')' 뒤부터 자른다.
+                ppid = int(f_.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children_dict.setdefault(ppid, []).append(int(entry))
+
+    pid_list = [root_pid]
+    for pid in pid_list:
+        pid_list += children_dict.get(pid, [])
+    return pid_list
+
+
+# 프로세스 트리 전체 RSS(MB). /proc이 없으면 None.
+def get_process_tree_rss_mb(root_pid):
+    if root_pid is None or not os.path.isdir('/proc'):
+        return None
 
+    rss_kb = 0
+    for pid in get_process_tree_pid_list(root_pid):
+        try:
+            with open(f'/proc/{pid}/status') as f_:
+                for line in f_:
+                    if line.startswith('VmRSS:'):
+                        rss_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return rss_kb / 1024
+
+
+def kill_process_tree(root_pid):
+    # 자식부터 죽인다.
+    for pid in reversed(get_process_tree_pid_list(root_pid)):
+        try:
+            os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+        except OSError:
+            pass
+
+
+# 크롬 드라이버 풀
+# 최대 size개까지 필요할 때 생성하고, 크롤링 스레드들이 빌려 쓰고 돌려준다.
+# - N 페이지 크롤링 또는 메모리 한도 초과 시 크롬을 교체한다.
+# - 워치독이 한 페이지에 너무 오래 걸린(멈춘) 크롬을 강제 종료한다.
+# - 교체/폐기되는 자리는 백그라운드에서 예비 크롬을 미리 띄워 채운다.
+class DriverPool:
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.LifoQueue()  # 최근에 쓴 드라이버부터 재사용
+        self._lock = threading.Lock()
+        self._created = 0  # 살아있거나 생성 중인 드라이버 수
+        self._info_dict = dict()  # id(driver) : 드라이버 상태 정보
+        self._watchdog_thread = None
+
+    # 생성할 자리 확보
+    def _reserve(self):
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _create_reserved(self):
+        logging.info(f'CHROME_DRIVER 생성 시작 ({self._created}/{self.size})')
+        try:
+            new_driver = create_driver()
+            new_driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT_SEC)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+        with self._lock:
+            self._info_dict[id(new_driver)] = {
+                'pid': get_driver_pid(new_driver),
+                'pages': 0,
+                'lease_start': None,
+                'killed': False,
+            }
+        logging.info('CHROME_DRIVER 생성 완료')
+        return new_driver
+
+    def acquire(self, timeout=DRIVER_ACQUIRE_TIMEOUT_SEC):
+        self.start_watchdog()
 
-logging.info('CHROME_DRIVER 초기화 시작')
-CHROME_DRIVER = get_driver()
-logging.info('CHROME_DRIVER 초기화 완료')
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            # 놀고 있는 드라이버가 없고 여유가 있으면 새로 띄우고, 풀이 꽉 찼으면 반납될 때까지 기다린다.
+            if self._reserve():
+                driver = self._create_reserved()
+            else:
+                driver = self._idle.get(timeout=timeout)
+
+        with self._lock:
+            info = self._info_dict.get(id(driver))
+            if info is not None:
+                info['lease_start'] = time.monotonic()
+        return driver
+
+    def release(self, driver):
+        with self._lock:
+            info = self._info_dict.get(id(driver))
+            if info is not None:
+                info['lease_start'] = None
+                info['pages'] += 1
+
+        if info is None or info['killed']:
+            self.discard(driver)
+            return
+
+        # 교체 조건 확인
+        recycle_reason = None
+        if info['pages'] >= DRIVER_MAX_PAGES:
+            recycle_reason = f"{info['pages']} 페이지 크롤링"
+        else:
+            rss_mb = get_process_tree_rss_mb(info['pid'])
+            if rss_mb is not None and rss_mb > DRIVER_MAX_RSS_MB:
+                recycle_reason = f'메모리 {rss_mb:.0f}MB 초과'
+
+        if recycle_reason:
+            logging.info(f'CHROME_DRIVER 교체 - {recycle_reason}')
+            self.discard(driver)
+            return
+
+        self._idle.put(driver)
+
+    # 에러난 드라이버는 종료하고 풀에서 뺀다.
+    def discard(self, driver):
+        with self._lock:
+            info = self._info_dict.pop(id(driver), None)
+            if info is None:
+                return  # 이미 폐기됨
+            self._created -= 1
+
+        logging.info('CHROME_DRIVER 폐기')
+
+        # 멈춘 크롬은 quit도 멈출 수 있어서 백그라운드에서 종료한다.
+        def quit_driver():
+            try:
+                driver.quit()
+            except Exception as e:
+                logging.error(f'CHROME_DRIVER 종료 에러 - {e}')
+            kill_process_tree(info['pid'])
+
+        threading.Thread(target=quit_driver, name='driver-quit', daemon=True).start()
+
+        self.prespawn()
+
+    # 예비 드라이버가 부족하면 백그라운드에서 미리 띄워둔다.
+    def prespawn(self):
+        if self._idle.qsize() >= DRIVER_SPARE_COUNT or not self._reserve():
+            return
+
+        def spawn():
+            try:
+                self._idle.put(self._create_reserved())
+            except Exception as e:
+                logging.error(f'예비 CHROME_DRIVER 생성 실패 - {e}')
+
+        threading.Thread(target=spawn, name='driver-prespawn', daemon=True).start()
+
+    def warm_up(self, count=1):
+        for _ in range(count):
+            if not self._reserve():
+                break
+            self._idle.put(self._create_reserved())
+
+    def start_watchdog(self):
+        with self._lock:
+            if self._watchdog_thread is not None:
+                return
+            self._watchdog_thread = threading.Thread(target=self._watchdog_loop, name='driver-watchdog',
+                                                     daemon=True)
+        self._watchdog_thread.start()
+
+    # 페이지 하나를 너무 오래 붙잡고 있는 크롬은 프로세스째 죽인다.
+    # 크롤링 스레드의 get/wait 호출이 에러로 풀리고, 반납 시 폐기된다.
+    def _watchdog_loop(self):
+        while True:
+            time.sleep(DRIVER_WATCHDOG_INTERVAL_SEC)
+
+            now = time.monotonic()
+            with self._lock:
+                hung_list = [info for info in self._info_dict.values()
+                             if not info['killed'] and info['lease_start'] is not None
+                             and now - info['lease_start'] > DRIVER_HANG_TIMEOUT_SEC]
+                for info in hung_list:
+                    info['killed'] = True
+
+            for info in hung_list:
+                logging.error(f"CHROME_DRIVER 응답 없음 - 강제 종료 (pid {info['pid']})")
+                kill_process_tree(info['pid'])
+
+
+@st.cache_resource
+def get_driver_pool():
+    return DriverPool(DRIVER_POOL_SIZE)
+
+
+# 앱 시작 시 백그라운드 스레드에서 크롬을 미리 띄워둔다. (프로세스당 1회)
+# HTTP 엔진을 쓰면 크롬은 차단됐을 때만 필요하므로 미리 띄우지 않는다. (첫 폴백 때 풀에서 생성)
+@st.cache_resource
+def start_driver_warm_up():
+    if not DRIVER_WARM_UP_ON_START or USE_HTTP_ENGINE:
+        return None
+
+    def warm_up():
+        logging.info('CHROME_DRIVER 백그라운드 초기화 시작')
+        try:
+            get_driver_pool().warm_up(1)
+        except Exception as e:
+            logging.error(f'CHROME_DRIVER 백그라운드 초기화 실패 - {e}')
+            return
+        logging.info('CHROME_DRIVER 백그라운드 초기화 완료')
+
+    warm_up_thread = threading.Thread(target=warm_up, name='driver-warm-up', daemon=True)
+    warm_up_thread.start()
+    return warm_up_thread
 
 
 # # # # # # # # # # # # # # # # # # # #
@@ -120,106 +485,374 @@ def get_impact_order(impact_class):
         return 0  # 예외 처리
 
 
-# 다운디텍터 크롤링
-@st.cache_data(show_spinner='서비스 상태 업데이트 중...')
-def get_downdetector_df(url, area, service_name=None):
-    global CHROME_DRIVER
+# 클래스 컬럼 전체를 한번에 영향도 등급으로 변환 (DANGER=3, WARNING=2, SUCCESS=1, 그 외=0)
+def get_impact_order_array(class_sr):
+    return class_sr.astype(CLASS_DTYPE).cat.codes.astype('int8') + 1
 
-    logging.info(f'다운디텍터 크롤링 시작 - {url} {area}')
 
-    # if service_name:
-    # https://downdetector.com/status/{service_name}/
+# 클래스/지역/카테고리 컬럼을 category 타입으로 맞춘다.
+def set_category_dtypes(df_):
+    df_[CLASS] = df_[CLASS].astype(CLASS_DTYPE)
+    df_[AREA] = df_[AREA].astype('category')
+    if CATEGORY in df_:
+        df_[CATEGORY] = df_[CATEGORY].astype(CATEGORY_DTYPE)
+    return df_
+
+
+# 스파크라인 클래스 목록에서 영향도 클래스를 찾는다.
+def get_impact_class(sparkline_classes):
+    for item in sparkline_classes:
+        if item in [DANGER, WARNING, SUCCESS]:
+            return item
+    return SUCCESS
+
+
+# data-values 문자열('[1, 2, ...]')을 int32 배열(SPARKLINE_POINTS 길이)로 변환
+# 짧으면 앞쪽을 0으로 채우고, 길면 최근 값만 남긴다. 이미 배열이면 그대로 맞춰준다.
+# 값이 깨져 있으면 0으로 채운 배열을 리턴한다.
+def parse_data_values(data_values):
+    values = np.zeros(SPARKLINE_POINTS, dtype=np.int32)
+    if data_values is None:
+        return values
 
     try:
-        CHROME_DRIVER.get(url)
-    except Exception as e:
-        logging.error(f'크롬 get 에러 발생!!! - {url} - {area}')
-        logging.error(f"{e}")
+        if isinstance(data_values, str):
+            parsed = np.fromstring(data_values.strip('[]'), dtype=np.int32, sep=',')
+        else:
+            parsed = np.asarray(data_values, dtype=np.int32)
+    except (ValueError, TypeError) as e:
+        logging.error(f'Error parsing data-values for a service: {e} - {str(data_values)[:200]}')
+        return values
+
+    parsed = parsed[-SPARKLINE_POINTS:]
+    values[SPARKLINE_POINTS - len(parsed):] = parsed
+    return values
+
+
+# 서비스 x 포인트 int32 행렬을 만들고, VALUES 컬럼은 행렬의 행 view로 바꾼다.
+# df의 i번째 행 = 행렬의 i번째 행 (index 0부터 순서대로 맞춘다)
+# 크롤링한 페이지마다 1번, 스냅샷(여러 페이지를 합친 df)마다 1번 만든다.
+def make_values_matrix(df_):
+    df_.reset_index(drop=True, inplace=True)
+    if len(df_) == 0:
+        return np.zeros((0, SPARKLINE_POINTS), dtype=np.int32)
+
+    values_matrix = np.ascontiguousarray(np.vstack([parse_data_values(item) for item in df_[VALUES]]))
+    df_[VALUES] = list(values_matrix)
+    return values_matrix
+
+
+# (지역, 서비스명) -> 행 번호 해시 인덱스. 대소문자 구분 없이 찾도록 casefold 한다.
+def make_service_index(df_):
+    service_index = dict()
+    for row, (name, area) in enumerate(zip(df_[NAME], df_[AREA])):
+        service_index.setdefault((area.casefold(), name.casefold()), row)  # 중복이면 먼저 나온 행
+    return service_index
+
+
+# 추출한 서비스 목록을 정렬된 df로 변환
+def make_status_df(data, area):
+    df_ = pd.DataFrame(data)
+
+    # 크롤링 실패 또는 비정상일 경우 None 리턴.
+    if df_ is None or len(df_) == 0:
+        return None
+
+    # 리포트 수(VALUES)는 여기서 행마다 변환하지 않고, 페이지 단위로 make_values_matrix 에서 한번에 행렬로 만든다.
+    df_sorted = df_.sort_values(by=CLASS, key=get_impact_order_array, ascending=False)
+    df_sorted = df_sorted.reset_index(drop=True)
+    df_sorted[AREA] = area  # 지역 컬럼 추가
+    set_category_dtypes(df_sorted)
+
+    # for debug
+    logging.debug(str(df_sorted))
+
+    # log_str = f'\n---------- {area} ----------\n'
+    # for i, row in df_sorted.iterrows():
+    #     log_str += f'{row[NAME]}\t{row[AREA]}\t{row[CLASS]}\t{row[VALUES]}\n'
+    # log_str += '------------------------------\n\n'
+    # logging.info(log_str)
+
+    return df_sorted
+
+
+# 페이지별 전송량, 데이터 확보까지 걸린 시간 기록
+def save_page_stats(url, area, engine, transfer_bytes, time_to_data_sec, service_count):
+    page_stats = {
+        'url': url,
+        'area': area,
+        'engine': engine,
+        'transfer_kb': None if transfer_bytes is None else round(transfer_bytes / 1024, 1),
+        'time_to_data_sec': round(time_to_data_sec, 2),
+        'services': service_count,
+        'crawled_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with _page_stats_lock:
+        PAGE_STATS_DICT[url] = page_stats
+
+    logging.info(f"페이지 측정 - {url} {area} [{engine}] "
+                 f"전송량 {page_stats['transfer_kb']}KB, 데이터 확보 {page_stats['time_to_data_sec']}초, "
+                 f"{service_count}개 서비스")
 
-        logging.info('CHROME_DRIVER 초기화 시작')
-        CHROME_DRIVER.quit()
 
-        get_driver.clear()  # 캐시 삭제
+def get_page_stats_df():
+    with _page_stats_lock:
+        return pd.DataFrame(list(PAGE_STATS_DICT.values()))
 
-        CHROME_DRIVER = get_driver()
-        logging.info('CHROME_DRIVER 초기화 완료')
 
-        logging.info('1회 재시도!!!')
+# # # # # # # # # # # # # # #
+# HTTP + lxml 크롤링 (브라우저 없이)
+# # # # # # # # # # # # # # #
+
+
+@st.cache_resource
+def get_http_session():
+    # 커넥션 풀을 재사용하는 세션. 일시적인 5xx 에러는 짧게 재시도한다.
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 504], allowed_methods=['GET'])
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+
+# 다운디텍터 카테고리 페이지 html에서 서비스명, data-values, 영향도 클래스 추출
+def parse_downdetector_html(html, url='', area=''):
+    try:
+        tree = lxml.html.fromstring(html)
+    except Exception as e:
+        logging.error(f'html 파싱 실패 - {url} {area} - {e}')
+        return []
+
+    data = []
+    for service in tree.xpath(CAPTION_XPATH):
         try:
-            CHROME_DRIVER.get(url)
+            name = service.xpath('.//h5')[0].text_content().strip()
+            sparkline = service.xpath(SPARKLINE_XPATH)[0]
+            data_values = sparkline.get('data-values')
+            impact_class = get_impact_class(sparkline.get('class', '').split())
+
+            data.append({NAME: name, VALUES: data_values, CLASS: impact_class})
+
         except Exception as e:
-            logging.error(f'재시도 get도 에러 발생!!! - {url} - {area}')
-            logging.error(f"{e}")
-            logging.error('None 리턴!')
-            return None
+            logging.error(f"Error extracting data for a service: {e}\n{url} - {area} - {service}")
+
+    return data
+
+
+# 브라우저 없이 HTTP로 받아서 파싱한다. 차단되거나 서비스가 하나도 없으면 None 리턴.
+def get_downdetector_df_by_http(url, area):
+    logging.info(f'다운디텍터 HTTP 크롤링 시작 - {url} {area}')
+    start_time = time.perf_counter()
 
-    # 페이지 로딩 대기
     try:
-        WebDriverWait(CHROME_DRIVER, 60).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".caption")))
+        res = get_http_session().get(url, timeout=HTTP_TIMEOUT_SEC)
     except Exception as e:
+        logging.error(f'HTTP get 에러 발생!!! - {url} - {area}')
         logging.error(f"{e}")
-        logging.error('최대 시간 동안 기다려도 페이지 로딩에 실패한 경우 - 그대로 처리한다.')
+        return None
+
+    if res.status_code != 200:
+        # 403, 429, 503 등은 봇 차단으로 보고 셀레니움으로 넘긴다.
+        logging.error(f'HTTP 크롤링 차단 또는 실패 - {url} {area} - status {res.status_code}')
+        return None
+
+    data = parse_downdetector_html(res.content, url, area)
+    if len(data) == 0:
+        logging.error(f'HTTP 응답에 서비스 목록 없음(차단 페이지로 추정) - {url} {area}')
+        return None
+
+    logging.info(f'다운디텍터 HTTP 크롤링 완료 - {url} {area} - {len(data)}개 서비스')
+
+    # 압축된 전송 크기를 알 수 있으면 그 값을, 아니면 본문 크기를 기록한다.
+    transfer_bytes = int(res.headers.get('Content-Length') or len(res.content))
+    save_page_stats(url, area, 'http', transfer_bytes, time.perf_counter() - start_time, len(data))
+    return make_status_df(data, area)
+
+
+# # # # # # # # # # # # # # #
+# 셀레니움 크롤링 (크롬)
+# # # # # # # # # # # # # # #
+
+
+# execute_script 1회 호출로 전체 서비스 추출
+def extract_services_by_script(driver, url, area):
+    item_list = json.loads(driver.execute_script(EXTRACT_SERVICES_SCRIPT))
+
+    data = []
+    for item in item_list:
+        try:
+            if 'error' in item:
+                raise ValueError(f"{item['error']} - {item.get('html')}")
+
+            name = item['name'].strip()
+            impact_class = get_impact_class(item['classes'].split())
+
+            data.append({NAME: name, VALUES: item['values'], CLASS: impact_class})
 
-    logging.info(f'다운디텍터 크롤링 완료 - {url} {area}')
+        except Exception as e:
+            logging.error(f"Error extracting data for a service: {e}\n{url} - {area} - {item}")
+
+    return data
+
+
+# page_source를 받아서 프로세스 안에서 파싱
+def extract_services_by_page_source(driver, url, area):
+    return parse_downdetector_html(driver.page_source, url, area)
+
+
+# 서비스마다 WebDriver 요소 조회 (기존 방식)
+def extract_services_by_element(driver, url, area):
+    from selenium.webdriver.common.by import By
 
-    # 서비스명, data-values, 영향도 클래스 추출
-    services = CHROME_DRIVER.find_elements(By.CSS_SELECTOR, ".caption")
+    services = driver.find_elements(By.CSS_SELECTOR, ".caption")
     data = []
 
     for service in services:
         try:
             name = service.find_element(By.TAG_NAME, "h5").text
-            data_values = service.find_element(By.CLASS_NAME, "sparkline").get_attribute("data-values")
-            sparkline_classes = service.find_element(By.CLASS_NAME, "sparkline").get_attribute("class").split()
-            impact_class = SUCCESS
-            for item in sparkline_classes:
-                if item in [DANGER, WARNING, SUCCESS]:
-                    impact_class = item
-                    break
+            sparkline = service.find_element(By.CLASS_NAME, "sparkline")
+            data_values = sparkline.get_attribute("data-values")
+            impact_class = get_impact_class(sparkline.get_attribute("class").split())
 
             data.append({NAME: name, VALUES: data_values, CLASS: impact_class})
 
         except Exception as e:
             logging.error(f"Error extracting data for a service: {e}\n{url} - {area} - {service}")
 
-    # 브라우저 종료
-    # CHROME_DRIVER.quit()
+    return data
 
-    df_ = pd.DataFrame(data)
 
-    # 크롤링 실패 또는 비정상일 경우 None 리턴.
-    if df_ is None or len(df_) == 0:
+EXTRACT_FUNC_DICT = {
+    'script': extract_services_by_script,
+    'page_source': extract_services_by_page_source,
+    'element': extract_services_by_element,
+}
+
+
+# 설정된 추출 방식부터 시도하고, 통째로 실패하면 다음 방식으로 넘어간다.
+def extract_services(driver, url, area):
+    mode_list = [SELENIUM_EXTRACT_MODE] + [mode for mode in EXTRACT_FUNC_DICT if mode != SELENIUM_EXTRACT_MODE]
+
+    for mode in mode_list:
+        try:
+            data = EXTRACT_FUNC_DICT[mode](driver, url, area)
+        except Exception as e:
+            logging.error(f'{mode} 방식 추출 실패 - {url} {area} - {e}')
+            continue
+
+        logging.info(f'{mode} 방식 추출 완료 - {url} {area} - {len(data)}개 서비스')
+        return data
+
+    return []
+
+
+# 드라이버가 명령에 응답하는지 확인 (페이지 로딩 실패와 드라이버 고장을 구분)
+def is_driver_alive(driver):
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception as e:
+        logging.error(f'드라이버 응답 확인 실패 - {e}')
+        return False
+
+
+def get_downdetector_df_by_selenium(url, area):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    logging.info(f'다운디텍터 크롤링 시작 - {url} {area}')
+
+    pool = get_driver_pool()
+    try:
+        driver = pool.acquire()
+    except Exception as e:
+        logging.error(f'크롬 드라이버 확보 실패!!! - {url} - {area}')
+        logging.error(f"{e}")
         return None
 
-    df_sorted = df_.sort_values(by=CLASS, key=lambda x: x.map(get_impact_order), ascending=False)
-    df_sorted = df_sorted.reset_index(drop=True)
-    df_sorted[AREA] = area  # 지역 컬럼 추가
+    start_time = time.perf_counter()
+    try:
+        driver.get(url)
+    except Exception as e:
+        logging.error(f'크롬 get 에러 발생!!! - {url} - {area}')
+        logging.error(f"{e}")
 
-    # for debug
-    logging.debug(str(df_sorted))
+        # 바로 재시도하지 않는다. 페이지 재시도 간격은 호출하는 쪽 서킷 브레이커가 늘려간다.
+        # 드라이버는 응답이 없을 때만 버리고, 살아있으면 풀에 반납해서 다시 쓴다.
+        if is_driver_alive(driver):
+            pool.release(driver)
+        else:
+            logging.error('응답 없는 드라이버 폐기')
+            pool.discard(driver)
+        return None
 
-    # log_str = f'\n---------- {url} ----------\n'
-    # for i, row in df_sorted.iterrows():
-    #     log_str += f'{row[NAME]}\t{row[AREA]}\t{row[CLASS]}\t{row[VALUES]}\n'
-    # log_str += '------------------------------\n\n'
-    # logging.info(log_str)
+    try:
+        # 페이지 로딩 대기
+        # 스크래핑 프로필에서는 스파크라인 값이 DOM에 들어오는 즉시 추출한다.
+        if SCRAPING_PROFILE:
+            data_locator = (By.CSS_SELECTOR, '.caption .sparkline[data-values]')
+        else:
+            data_locator = (By.CSS_SELECTOR, '.caption')
 
-    return df_sorted
+        try:
+            WebDriverWait(driver, PAGE_DATA_TIMEOUT_SEC).until(EC.presence_of_all_elements_located(data_locator))
+        except Exception as e:
+            logging.error(f"{e}")
+            logging.error('최대 시간 동안 기다려도 페이지 로딩에 실패한 경우 - 그대로 처리한다.')
+
+        logging.info(f'다운디텍터 크롤링 완료 - {url} {area}')
+
+        # 서비스명, data-values, 영향도 클래스 추출
+        data = extract_services(driver, url, area)
+        time_to_data_sec = time.perf_counter() - start_time
+
+        try:
+            transfer_bytes = driver.execute_script(PAGE_TRANSFER_SIZE_SCRIPT)
+        except Exception as e:
+            logging.error(f'전송량 측정 실패 - {e}')
+            transfer_bytes = None
+        save_page_stats(url, area, 'selenium', transfer_bytes, time_to_data_sec, len(data))
+    finally:
+        # 드라이버는 종료하지 않고 풀에 반납한다.
+        pool.release(driver)
+
+    return make_status_df(data, area)
+
+
+# 다운디텍터 크롤링
+# 백그라운드 크롤러가 주기적으로 호출하므로 결과를 캐시하지 않는다.
+def get_downdetector_df(url, area, service_name=None):
+    # if service_name:
+    # https://downdetector.com/status/{service_name}/
+
+    # 빠른 HTTP 경로를 먼저 시도한다.
+    if USE_HTTP_ENGINE:
+        df_ = get_downdetector_df_by_http(url, area)
+        if df_ is not None:
+            return df_
+        logging.info(f'HTTP 크롤링 실패 - 셀레니움으로 재시도 - {url} {area}')
+
+    return get_downdetector_df_by_selenium(url, area)
 
 
 def make_plot(df_):
+    import matplotlib.pyplot as plt
+
     # 색상 매핑 딕셔너리
     color_map = {DANGER: 'red', WARNING: 'orange', SUCCESS: 'green'}
 
     # 서브플롯 그리기
     fig, axs = plt.subplots(len(df_), figsize=(10, 8))
 
+    values_matrix = make_values_matrix(df_)
+
     # 각 행에 대해 서브플롯 그리기
     for i, row in df_.iterrows():
         # 각 impact_class에 해당하는 색상 선택
         color = color_map.get(row[CLASS], 'blue')  # 없는 경우 기본값으로 파란색 지정
-        data_values = [int(x) for x in row[VALUES].strip('[]').split(', ')]
-        axs[i].plot(data_values, color=color)  # 색상 적용
+        axs[i].plot(values_matrix[i], color=color)  # 색상 적용
         axs[i].set_title(row[NAME])
 
     plt.tight_layout()
@@ -6,6 +6,7 @@ st.set_page_config(layout="wide", page_title='GSS')
 
 
 import config
+import get_downdetector_web
 
 
 # 로깅 설정
@@ -16,6 +17,10 @@ import config
 config.init_session_state()
 
 
+# 크롬은 첫 화면 렌더링을 막지 않도록 백그라운드에서 미리 띄워둔다. (셀레니움으로만 크롤링할 때)
+get_downdetector_web.start_driver_warm_up()
+
+
 # # # # # # # # # # # # # # # # # # # #
 # 페이지 구성
 # # # # # # # # # # # # # # # # # # # #
@@ -1,5 +1,4 @@
 import logging
-import requests
 import pandas as pd
 import pickle
 import os
@@ -72,52 +71,44 @@ def get_google_outage_news(keyword_):
     if and_keyword:
         query += ' ' + and_keyword[0]
 
-    url = f"https://news.google.com/rss/search?q={query}+when:{search_hour}h"
-    url += f'&hl=en-US&gl=US&ceid=US:en'
-    url = url.replace(' ', '%20')
-
     title_list = []
     source_list = []
     pubtime_list = []
     link_list = []
 
-    try:
-        res = requests.get(url)  # , verify=False)
-        logging.info('원본 링크: ' + url)
-
-        if res.status_code == 200:
-            datas = feedparser.parse(res.text).entries
-            for data in datas:
-                title = data.title
-                logging.info('구글뉴스제목(원본): ' + title)
+    # 공용 뉴스 클라이언트 - 커넥션 재사용, 검색어별 캐시/조건부 요청, 동시 요청 합치기
+    rss_text = config.get_news_client().fetch_search(query, search_hour)
+    if rss_text is None:
+        return None
 
-                minus_index = title.rindex(' - ')
-                title = title[:minus_index].strip()
+    try:
+        datas = feedparser.parse(rss_text).entries
+        for data in datas:
+            title = data.title
+            logging.info('구글뉴스제목(원본): ' + title)
 
-                # 기사 제목에 검색 키워드가 없으면 넘긴다.
-                if keyword_.lower() not in title.lower():
-                    continue
+            minus_index = title.rindex(' - ')
+            title = title[:minus_index].strip()
 
-                title_list.append(title)
-                source_list.append(data.source.title)
-                link_list.append(data.link)
+            # 기사 제목에 검색 키워드가 없으면 넘긴다.
+            if keyword_.lower() not in title.lower():
+                continue
 
-                pubtime = datetime.strptime(data.published, "%a, %d %b %Y %H:%M:%S %Z")
-                # GMT+9 (Asia/Seoul)으로 변경
-                gmt_plus_9 = pytz.FixedOffset(540)  # 9 hours * 60 minutes = 540 minutes
-                pubtime = pubtime.replace(tzinfo=pytz.utc).astimezone(gmt_plus_9)
+            title_list.append(title)
+            source_list.append(data.source.title)
+            link_list.append(data.link)
 
-                pubtime_str = pubtime.strftime('%Y-%m-%d %H:%M:%S')
-                pubtime_list.append(pubtime_str)
+            pubtime = datetime.strptime(data.published, "%a, %d %b %Y %H:%M:%S %Z")
+            # GMT+9 (Asia/Seoul)으로 변경
+            gmt_plus_9 = pytz.FixedOffset(540)  # 9 hours * 60 minutes = 540 minutes
+            pubtime = pubtime.replace(tzinfo=pytz.utc).astimezone(gmt_plus_9)
 
-        else:
-            logging.error("Google 뉴스 수집 실패! Error Code: " + str(res.status_code))
-            logging.error(str(res))
-            return None
+            pubtime_str = pubtime.strftime('%Y-%m-%d %H:%M:%S')
+            pubtime_list.append(pubtime_str)
 
     except Exception as e:
         logging.error(e)
-        logging.error("Google 뉴스 RSS 피드 조회 오류 발생!")
+        logging.error("Google 뉴스 RSS 피드 파싱 오류 발생!")
         return None
 
     # 결과를 dict 형태로 저장
@@ -205,7 +196,8 @@ def translate_eng_to_kor(text):
     credential_trans = service_account.Credentials.from_service_account_file(KEY_PATH)
     translate_client = translate.Client(credentials=credential_trans)
 
-    result = translate_client.translate(text, target_language='ko')
+    with config.host_slot(config.TRANSLATE_HOST):
+        result = translate_client.translate(text, target_language='ko')
     # print(names)
     translated_text = result['translatedText'].replace('&amp;', '&')
 
@@ -291,8 +283,9 @@ def get_geo_location(map_df_):
             map_df_.loc[i, 'lon'] = cache['lon']
             continue
 
-        # 세션 캐시에 없으면 위경도 api를 써서 불러온다.
-        geo = geolocator.geocode(row['Location'])
+        # 세션 캐시에 없으면 위경도 api를 써서 불러온다. (호스트 요청 제한 공유)
+        with config.host_slot(config.NOMINATIM_HOST):
+            geo = geolocator.geocode(row['Location'])
 
         if geo:
             map_df_.loc[i, 'lat'] = geo.latitude
@@ -300,7 +293,8 @@ def get_geo_location(map_df_):
             save_loc_cache(row['Location'], geo.latitude, geo.longitude)
         else:
             # retry
-            geo = geolocator.geocode(row['Location'].split(',')[0])
+            with config.host_slot(config.NOMINATIM_HOST):
+                geo = geolocator.geocode(row['Location'].split(',')[0])
 
             if geo:
                 map_df_.loc[i, 'lat'] = geo.latitude
@@ -310,7 +304,6 @@ def get_geo_location(map_df_):
                 # retry까지 실패할 경우.
                 logging.error('Geo ERROR!!! :' + str(geo))
 
-        time.sleep(0.2)
     return map_df_
 
 
@@ -0,0 +1,204 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime
+from urllib.parse import quote
+import feedparser
+import pandas as pd
+import pytz
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+NEWS_HOST = 'news.google.com'
+NEWS_SEARCH_URL = f'https://{NEWS_HOST}/rss/search'
+NEWS_LOCALE_PARAM = 'hl=en-US&gl=US&ceid=US:en'
+
+
+# 캐시 키. 같은 검색어는 대소문자/공백과 상관없이 같은 캐시를 쓴다.
+# (요청 URL 에는 AND/OR 연산자 대소문자를 지키기 위해 공백만 정리한 검색어를 쓴다.)
+def normalize_query(query):
+    return ' '.join(query.casefold().split())
+
+
+# search_hour 가 0 이나 None 이면 기간 제한 없이 검색한다.
+def build_search_url(query, search_hour=None):
+    if search_hour:
+        query += f' when:{search_hour}h'
+    return f'{NEWS_SEARCH_URL}?q={quote(query, safe=":")}&{NEWS_LOCALE_PARAM}'
+
+
+NEWS_COLUMN_LIST = ['제목', '언론사', '발행시간', '링크']
+
+
+# 서비스명 + 추가 키워드 여러 개를 RSS 요청 1번으로 합친 검색어
+# ['outage'] -> 'AWS AND outage', ['outage', 'failure'] -> 'AWS AND (outage OR failure)'
+def build_news_query(keyword, and_keyword_list=None):
+    and_keyword_list = [item for item in (and_keyword_list or []) if item]
+    if len(and_keyword_list) == 0:
+        return keyword
+    if len(and_keyword_list) == 1:
+        return f'{keyword} AND {and_keyword_list[0]}'
+    return f'{keyword} AND ({" OR ".join(and_keyword_list)})'
+
+
+# 키워드 조합별로 1번만 만드는 강조용 정규식. 키워드는 escape 하고, 긴 키워드를 먼저 맞춘다.
+@lru_cache(maxsize=256)
+def get_highlight_pattern(keyword_tuple):
+    keyword_list = sorted({item for item in keyword_tuple if item}, key=len, reverse=True)
+    if len(keyword_list) == 0:
+        return None
+    return re.compile('|'.join(re.escape(item) for item in keyword_list), flags=re.IGNORECASE)
+
+
+# 제목에 등장하는 키워드를 한번에 강조 표시 (제목의 원래 대소문자 유지)
+def highlight_keywords(title, keyword_tuple, template=':blue-background[{}]'):
+    pattern = get_highlight_pattern(tuple(keyword_tuple))
+    if pattern is None:
+        return title
+    return pattern.sub(lambda match: template.format(match.group(0)), title)
+
+
+# RSS 본문을 뉴스 df로 변환. keyword 가 있으면 제목에 keyword 가 들어간 기사만 남긴다.
+# 발행시간은 한국 시간 문자열 (정렬하면 시간 순)
+def parse_search_rss(rss_text, keyword=None):
+    gmt_plus_9 = pytz.FixedOffset(540)  # 9 hours * 60 minutes = 540 minutes
+    row_list = []
+
+    for data in feedparser.parse(rss_text).entries:
+        # 제목 끝의 ' - 언론사' 를 뗀다.
+        title = data.title.rpartition(' - ')[0].strip() or data.title.strip()
+
+        # 기사 제목에 검색 키워드가 없으면 넘긴다.
+        if keyword and keyword.lower() not in title.lower():
+            continue
+
+        pubtime = datetime.strptime(data.published, "%a, %d %b %Y %H:%M:%S %Z")
+        pubtime = pubtime.replace(tzinfo=pytz.utc).astimezone(gmt_plus_9)
+        row_list.append([title, data.source.title, pubtime.strftime('%Y-%m-%d %H:%M:%S'), data.link])
+
+    return pd.DataFrame(row_list, columns=NEWS_COLUMN_LIST)
+
+
+class CacheEntry:
+    def __init__(self, text, etag, last_modified, fetched_at):
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+
+class InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+# # # # # # # # # # # # # # #
+# 구글 뉴스 RSS 공용 클라이언트
+# # # # # # # # # # # # # # #
+
+# - 커넥션 풀을 재사용하는 세션 1개를 모든 세션/스레드가 같이 쓴다.
+# - 검색어별로 ttl_sec 동안은 캐시된 응답을 그대로 돌려준다.
+# - ttl 이 지나면 ETag / Last-Modified 로 조건부 요청을 보내서, 바뀐 게 없으면(304) 본문 없이 캐시를 연장한다.
+# - 같은 검색어를 여러 세션이 동시에 요청하면 1번만 가져오고 나머지는 그 결과를 기다린다.
+# - 요청이 실패하면 이전 응답이 있으면 그걸 돌려준다.
+class NewsClient:
+    def __init__(self, ttl_sec, timeout_sec=10, pool_size=10, max_entries=500, slot_func=None):
+        self.ttl_sec = ttl_sec
+        self.timeout_sec = timeout_sec
+        self.max_entries = max_entries
+        self.slot_func = slot_func  # 호스트 요청 제한 (host -> context manager)
+
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504], allowed_methods=['GET'])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # 키 -> CacheEntry (오래된 것부터)
+        self._in_flight_dict = dict()  # 키 -> InFlight
+        self.stats = {'hit': 0, 'coalesced': 0, 'not_modified': 0, 'fetch': 0, 'error': 0}
+
+    # 검색어로 RSS 본문 가져오기. 리턴: RSS 텍스트 또는 None
+    def fetch_search(self, query, search_hour=None):
+        url = build_search_url(' '.join(query.split()), search_hour)
+        return self.fetch((normalize_query(query), search_hour or 0), url)
+
+    def fetch(self, key, url):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry.fetched_at < self.ttl_sec:
+                self.stats['hit'] += 1
+                return entry.text
+
+            in_flight = self._in_flight_dict.get(key)
+            owner = in_flight is None
+            if owner:
+                in_flight = self._in_flight_dict[key] = InFlight()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            # 다른 세션이 같은 검색어를 가져오는 중이면 그 결과를 같이 쓴다.
+            in_flight.done.wait(self.timeout_sec * 3)
+            with self._lock:
+                entry = self._cache.get(key)
+            return entry.text if entry is not None else None
+
+        try:
+            entry = self._request(url, entry)
+            with self._lock:
+                if entry is not None:
+                    self._cache[key] = entry
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+        finally:
+            with self._lock:
+                self._in_flight_dict.pop(key, None)
+            in_flight.done.set()
+
+        return entry.text if entry is not None else None
+
+    # 리턴: 새 CacheEntry, 실패 시 이전 entry (없으면 None)
+    def _request(self, url, entry):
+        headers = dict()
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        try:
+            if self.slot_func is not None:
+                with self.slot_func(NEWS_HOST):
+                    res = self.session.get(url, headers=headers, timeout=self.timeout_sec)
+            else:
+                res = self.session.get(url, headers=headers, timeout=self.timeout_sec)
+            logging.info(f'원본 링크: {url} - {res.status_code}')
+        except Exception as e:
+            logging.error(f'Google 뉴스 RSS 피드 조회 오류 발생! - {url} - {e}')
+            self.stats['error'] += 1
+            return entry
+
+        if res.status_code == 304 and entry is not None:
+            self.stats['not_modified'] += 1
+            entry.fetched_at = time.time()
+            return entry
+
+        if res.status_code != 200:
+            logging.error(f'Google 뉴스 수집 실패! Error Code: {res.status_code} - {url}')
+            self.stats['error'] += 1
+            return entry
+
+        self.stats['fetch'] += 1
+        return CacheEntry(text=res.text, etag=res.headers.get('ETag'),
+                          last_modified=res.headers.get('Last-Modified'), fetched_at=time.time())
@@ -0,0 +1,126 @@
+import logging
+import time
+from typing import NamedTuple
+import numpy as np
+import get_downdetector_web
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 연관 장애 묶기 (AWS, Cloudflare 등 공통 인프라 장애 추정)
+# # # # # # # # # # # # # # #
+
+# 1. 최근 급증 중인 서비스(다운디텍터 또는 자체 이상 감지 등급이 WARNING 이상)만 후보로 뽑는다.
+# 2. 후보들의 최근 WINDOW_POINTS 개 포인트를 행 단위로 표준화한 뒤 행렬곱 한번으로 상관계수 행렬을 구한다.
+# 3. 상관계수가 MIN_CORRELATION 이상이면서 급증 시작 시점이 ONSET_TOLERANCE_POINTS 이내인 쌍을 이어서
+#    연결 요소(connected component)별로 묶는다.
+# 4. 묶음 안에 공통 인프라 제공자가 있으면 그것을, 없으면 가장 먼저/크게 급증한 서비스를 원인으로 추정한다.
+
+WINDOW_POINTS = 16  # 4시간
+MIN_CORRELATION = 0.8
+ONSET_TOLERANCE_POINTS = 2  # 30분
+MIN_CLUSTER_SIZE = 3
+
+# 원인 후보 공통 인프라 (서비스명 casefold 에 포함되면 해당)
+ROOT_PROVIDER_LIST = ['aws', 'amazon web services', 'cloudflare', 'google cloud', 'azure', 'microsoft 365',
+                      'akamai', 'fastly', 'crowdstrike', 'oracle cloud', 'ibm cloud', 'digitalocean']
+
+
+class OutageCluster(NamedTuple):
+    root: str  # 추정 원인 서비스명
+    root_is_provider: bool  # 원인이 공통 인프라 목록에 있는 서비스인지 여부
+    name_list: list  # 묶인 서비스명 (급증 시작이 빠른 순)
+    onset_index: int  # 묶음의 급증 시작 포인트 (스파크라인 index)
+
+
+# 행별로 최근 구간 평균 대비 처음으로 크게 오른 포인트 (급증 시작 시점)
+def get_onset_index(window_matrix):
+    median = np.median(window_matrix, axis=1, keepdims=True)
+    peak = window_matrix.max(axis=1, keepdims=True)
+    rising = window_matrix >= median + (peak - median) / 2
+    return rising.argmax(axis=1)
+
+
+def is_root_provider(name):
+    name_ = name.casefold()
+    return any(provider in name_ for provider in ROOT_PROVIDER_LIST)
+
+
+# 불리언 인접 행렬의 연결 요소. 리턴: 요소별 행 번호 배열 리스트
+def get_connected_components(adjacency):
+    num_nodes = len(adjacency)
+    component_id = np.full(num_nodes, -1, dtype=np.int32)
+    component_list = []
+
+    for start in range(num_nodes):
+        if component_id[start] >= 0:
+            continue
+
+        # 한 요소를 프론티어 단위로 한번에 넓혀간다.
+        frontier = np.zeros(num_nodes, dtype=bool)
+        frontier[start] = True
+        member = frontier.copy()
+        while frontier.any():
+            frontier = adjacency[frontier].any(axis=0) & ~member
+            member |= frontier
+
+        component_id[member] = len(component_list)
+        component_list.append(np.flatnonzero(member))
+
+    return component_list
+
+
+# 리턴: 큰 묶음 순 OutageCluster 리스트
+def find_outage_clusters(df_, values_matrix):
+    start_time = time.perf_counter()
+    if len(df_) == 0:
+        return []
+
+    # 급증 후보 (다운디텍터 등급 또는 자체 이상 감지 등급이 WARNING 이상)
+    level_codes = df_[get_downdetector_web.CLASS].cat.codes.to_numpy()
+    if get_downdetector_web.ANOMALY in df_.columns:
+        level_codes = np.maximum(level_codes, df_[get_downdetector_web.ANOMALY].cat.codes.to_numpy())
+    candidate_rows = np.flatnonzero(level_codes >= 1)
+    if len(candidate_rows) < MIN_CLUSTER_SIZE:
+        return []
+
+    window_matrix = values_matrix[candidate_rows, -WINDOW_POINTS:].astype(np.float32)
+
+    # 행 단위 표준화 후 행렬곱 한번으로 피어슨 상관계수 행렬
+    centered = window_matrix - window_matrix.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(centered, axis=1, keepdims=True)
+    normalized = np.divide(centered, norm, out=np.zeros_like(centered), where=norm > 0)
+    correlation = normalized @ normalized.T
+
+    onset_index = get_onset_index(window_matrix)
+    same_window = np.abs(onset_index[:, None] - onset_index[None, :]) <= ONSET_TOLERANCE_POINTS
+
+    adjacency = (correlation >= MIN_CORRELATION) & same_window
+    np.fill_diagonal(adjacency, False)
+
+    name_array = df_[get_downdetector_web.NAME].to_numpy()
+    peak_array = window_matrix.max(axis=1)
+    cluster_list = []
+
+    for component in get_connected_components(adjacency):
+        if len(component) < MIN_CLUSTER_SIZE:
+            continue
+
+        # 급증 시작이 빠른 순, 같으면 리포트가 많은 순
+        order = component[np.lexsort((-peak_array[component], onset_index[component]))]
+        name_list = [name_array[candidate_rows[i]] for i in order]
+
+        provider_list = [name for name in name_list if is_root_provider(name)]
+        root = provider_list[0] if provider_list else name_list[0]
+
+        cluster_list.append(OutageCluster(root=root, root_is_provider=len(provider_list) > 0, name_list=name_list,
+                                          onset_index=int(onset_index[order[0]]) - WINDOW_POINTS
+                                          + values_matrix.shape[1]))
+
+    cluster_list.sort(key=lambda x: len(x.name_list), reverse=True)
+    logging.info(f'연관 장애 묶기 완료 - 후보 {len(candidate_rows)}개, 묶음 {len(cluster_list)}개, '
+                 f'{(time.perf_counter() - start_time) * 1000:.1f}ms')
+    return cluster_list
@@ -1,19 +1,14 @@
 import logging
-import requests
-import pandas as pd
 import pickle
 import os
 import time
 from geopy.geocoders import Nominatim
-import feedparser
 from datetime import datetime, timedelta
 import pytz
-import re
 import streamlit as st
-from google.cloud import translate_v2 as translate  # pip install google-cloud-translate==2.0.1
-from google.oauth2 import service_account
 import config
 import dashboard_dd
+import news_client
 
 # 로깅 설정
 # logging.basicConfig(level=logging.INFO)
@@ -33,68 +28,21 @@ config.init_session_state()
 
 
 def get_google_outage_news(keyword_):
-    query = keyword_
-    if and_keyword:
-        query += ' AND ' + and_keyword[0]
+    # 추가 키워드가 여러 개여도 OR 로 묶어서 요청은 1번만 한다. 서비스명 포함 여부는 받아서 거른다.
+    query = news_client.build_news_query(keyword_, and_keyword)
 
-    url = f"https://news.google.com/rss/search?q={query}"
-
-    if search_hour:
-        url += f"+when:{search_hour}h"
-
-    url += f'&hl=en-US&gl=US&ceid=US:en'
-    url = url.replace(' ', '%20')
-
-    title_list = []
-    source_list = []
-    pubtime_list = []
-    link_list = []
+    # 공용 뉴스 클라이언트 - 커넥션 재사용, 검색어별 캐시/조건부 요청, 동시 요청 합치기
+    rss_text = config.get_news_client().fetch_search(query, search_hour)
+    if rss_text is None:
+        return None
 
     try:
-        res = requests.get(url)  # , verify=False)
-        logging.info('원본 링크: ' + url)
-
-        if res.status_code == 200:
-            datas = feedparser.parse(res.text).entries
-            for data in datas:
-                title = data.title
-                logging.info('구글뉴스제목(원본): ' + title)
-
-                minus_index = title.rindex(' - ')
-                title = title[:minus_index].strip()
-
-                # 기사 제목에 검색 키워드가 없으면 넘긴다.
-                if keyword_.lower() not in title.lower():
-                    continue
-
-                title_list.append(title)
-                source_list.append(data.source.title)
-                link_list.append(data.link)
-
-                pubtime = datetime.strptime(data.published, "%a, %d %b %Y %H:%M:%S %Z")
-                # GMT+9 (Asia/Seoul)으로 변경
-                gmt_plus_9 = pytz.FixedOffset(540)  # 9 hours * 60 minutes = 540 minutes
-                pubtime = pubtime.replace(tzinfo=pytz.utc).astimezone(gmt_plus_9)
-
-                pubtime_str = pubtime.strftime('%Y-%m-%d %H:%M:%S')
-                pubtime_list.append(pubtime_str)
-
-        else:
-            logging.error("Google 뉴스 수집 실패! Error Code: " + str(res.status_code))
-            logging.error(str(res))
-            return None
-
+        return news_client.parse_search_rss(rss_text, keyword_)
     except Exception as e:
         logging.error(e)
-        logging.error("Google 뉴스 RSS 피드 조회 오류 발생!")
+        logging.error("Google 뉴스 RSS 피드 파싱 오류 발생!")
         return None
 
-    # 결과를 dict 형태로 저장
-    result = {'제목': title_list, '언론사': source_list, '발행시간': pubtime_list, '링크': link_list}
-
-    df = pd.DataFrame(result)
-    return df
-
 
 def display_news_df(ndf, keyword_):
     # st.divider()
@@ -121,9 +69,8 @@ def display_news_df(ndf, keyword_):
         # title = row['제목'].replace(keyword_, f':yellow-background[{keyword_}]')
         # logging.info('keyword: ' + keyword_)
         # logging.info('before: ' + row['제목'])
-        title = re.sub(keyword_, f':blue-background[{keyword_}]', row['제목'], flags=re.IGNORECASE)
-        if and_keyword:
-            title = re.sub(and_keyword[0], f':blue-background[{and_keyword[0]}]', title, flags=re.IGNORECASE)
+        # 서비스명과 추가 키워드를 미리 컴파일한 정규식 1개로 한번에 강조한다.
+        title = news_client.highlight_keywords(row['제목'], (keyword_, *and_keyword))
         # logging.info('after : ' + title)
 
         # 제목 번역
@@ -161,46 +108,9 @@ def fetch_news(keyword_, infinite_loop=False):
 # # # # # # # # # # # # # # #
 
 
+# 모든 세션이 공유하는 번역 캐시를 쓴다. (새 알람 서비스는 미리 번역되어 있음)
 def translate_eng_to_kor(text):
-    # 캐시를 먼저 뒤져본다.
-    cache_text = load_trans_cache(text)
-    if cache_text:
-        logging.info('trans cache hit! - ' + text + ' : ' + cache_text)
-        return cache_text  # 캐시힛!
-
-    # 캐시에 없으면 구글 api로 번역을 한다.
-    if not os.path.exists(config.KEY_PATH):
-        return ''
-
-    credential_trans = service_account.Credentials.from_service_account_file(config.KEY_PATH)
-    translate_client = translate.Client(credentials=credential_trans)
-
-    result = translate_client.translate(text, target_language='ko')
-    # print(names)
-    translated_text = result['translatedText'].replace('&amp;', '&')
-
-    # 캐시에 저장한다.
-    save_trans_cache(text, translated_text)
-
-    return translated_text
-
-
-def save_trans_cache(eng_text, kor_text):
-    if len(st.session_state.trans_text_list) >= 100:  # 100개 이하로 유지한다.
-        st.session_state.trans_text_list.pop(0)
-
-    st.session_state.trans_text_list.append((eng_text, kor_text))  # 번역 튜플을 리스트에 삽입
-    # 캐시 파일에 저장
-    with open(config.TRANS_CACHE_FILE, 'wb') as f_:
-        pickle.dump(st.session_state.trans_text_list, f_)
-        logging.info('번역 캐시 파일 업데이트 완료')
-
-
-def load_trans_cache(eng_text):
-    for e_txt, k_txt in st.session_state.trans_text_list:
-        if eng_text == e_txt:
-            return k_txt  # 캐시 힛
-    return None
+    return config.get_translator().translate(text)
 
 
 # # # # # # # # # # # # # # #
@@ -261,8 +171,9 @@ def get_geo_location(map_df_):
             map_df_.loc[i, 'lon'] = cache['lon']
             continue
 
-        # 세션 캐시에 없으면 위경도 api를 써서 불러온다.
-        geo = geolocator.geocode(row['Location'])
+        # 세션 캐시에 없으면 위경도 api를 써서 불러온다. (호스트 요청 제한 공유)
+        with config.host_slot(config.NOMINATIM_HOST):
+            geo = geolocator.geocode(row['Location'])
 
         if geo:
             map_df_.loc[i, 'lat'] = geo.latitude
@@ -270,7 +181,8 @@ def get_geo_location(map_df_):
             save_loc_cache(row['Location'], geo.latitude, geo.longitude)
         else:
             # retry
-            geo = geolocator.geocode(row['Location'].split(',')[0])
+            with config.host_slot(config.NOMINATIM_HOST):
+                geo = geolocator.geocode(row['Location'].split(',')[0])
 
             if geo:
                 map_df_.loc[i, 'lat'] = geo.latitude
@@ -280,7 +192,6 @@ def get_geo_location(map_df_):
                 # retry까지 실패할 경우.
                 logging.error('Geo ERROR!!! :' + str(geo))
 
-        time.sleep(0.2)
     return map_df_
 
 
@@ -333,10 +244,16 @@ service_code_name = st.sidebar.selectbox(
 
 search_hour = st.sidebar.number_input('최근 몇시간 뉴스를 검색할까요? (0=무제한)', value=1, format='%d')
 
-and_keyword = st.sidebar.multiselect("뉴스 검색 추가 키워드 (1개만 적용 가능)",
+and_keyword = st.sidebar.multiselect("뉴스 검색 추가 키워드 (여러 개는 OR 검색)",
                                      options=['outage', 'blackout', 'failure'],
                                      default=['outage'])
 
+chart_period = st.sidebar.selectbox('리포트 차트 기간', list(config.CHART_PERIOD_DICT), index=0)
+
+show_alarm_news = st.sidebar.checkbox('알람 서비스 전체 뉴스 보기', value=False)
+
+show_broad_news = st.sidebar.checkbox('광역 뉴스 서비스 매칭 보기', value=False)
+
 st.session_state.search_interval_min = st.sidebar.number_input('새로고침 주기(분)',
                                                                value=st.session_state.search_interval_min,
                                                                format='%d')
@@ -368,6 +285,9 @@ if uploaded_file is not None:
 
 # 서비스 선택시 처리
 if service_code_name:
+    # 보고 있는 서비스가 있는 페이지는 백그라운드 크롤러가 더 자주 크롤링한다.
+    config.register_watch_list(st.session_state.selected_area, [service_code_name])
+
     # 본문 화면 구성
     title_placeholder = st.empty()
     col1, col2 = st.columns(2)
@@ -385,20 +305,30 @@ if service_code_name:
                 st.subheader(f'**{service_code_name}**')
         else:
             # 상태
-            color, color_code, icon = config.get_status_color(service_code_name, status)
+            color, color_code, icon = config.get_status_color(service_code_name, status,
+                                                             area=st.session_state.selected_area)
 
             with title_placeholder.container():
                 st.subheader(f'**{service_code_name}**  :{color}[{icon}]')
+                st.caption(f'데이터 기준 - {config.get_status_age_text(st.session_state.selected_area)}')
 
     # 컬럼2 - 차트
     with col2_placeholder.container():
         if report_list is not None:
-            st.write('📈 Live Report Chart (Last 24 hours)')
+            chart_hours = config.CHART_PERIOD_DICT[chart_period]
+            st.write(f'📈 Live Report Chart (Last {chart_period})')
 
             with st.container():
                 # chart_data = pd.DataFrame(report_list, columns=["Report Count"])
                 # st.line_chart(chart_data, color=color_code)
-                dashboard_dd.display_chart(report_list, color_code, chart_height=500, label_tick=True)
+                if chart_hours <= 24:
+                    dashboard_dd.display_chart(report_list, color_code, chart_height=500, label_tick=True)
+                else:
+                    # 24시간보다 긴 기간은 장기 이력에서 가져온다.
+                    history_values, step_min = config.get_report_history_values(st.session_state.selected_area,
+                                                                                service_code_name, chart_hours)
+                    dashboard_dd.display_chart(history_values, color_code, chart_height=500, label_tick=True,
+                                               step_min=step_min)
         else:
             st.write('')  # no report chart
 
@@ -409,6 +339,28 @@ if service_code_name:
         fetch_news(service_code_name)
 
 
+# 레드 알람이 뜬 모든 서비스의 뉴스를 한번에 동시 검색해서 최신순으로 보여준다.
+if show_alarm_news:
+    st.divider()
+    with st.spinner('알람 서비스 뉴스 검색중...'):
+        alarm_news_df = config.get_alarm_news_df(config.AREA_LIST, search_hour, and_keyword)
+
+    st.write(f'🚨 알람 서비스 전체 뉴스 ({len(alarm_news_df)}건)')
+    st.dataframe(alarm_news_df, hide_index=True, use_container_width=True,
+                 column_config={'링크': st.column_config.LinkColumn('링크', display_text='📝')})
+
+
+# 광역 뉴스 피드(outage/down/blackout)를 한번씩만 가져와서 전체 서비스 목록과 역매칭한다.
+if show_broad_news:
+    st.divider()
+    with st.spinner('광역 뉴스 검색중...'):
+        broad_news_df = config.get_broad_news_df(search_hour)
+
+    st.write(f'🌐 광역 뉴스 서비스 매칭 ({broad_news_df["서비스"].nunique()}개 서비스, {len(broad_news_df)}건)')
+    st.dataframe(broad_news_df, hide_index=True, use_container_width=True,
+                 column_config={'링크': st.column_config.LinkColumn('링크', display_text='📝')})
+
+
 # 주기적으로 페이지를 새로고침한다.
 # 사이드바에 타이머 표기
 st.sidebar.divider()
@@ -436,5 +388,5 @@ if service_code_name:
     timer_placeholder.markdown("⏰ 카운트다운 완료! 서비스 상태 재검색!")
 
     logging.info('재검색!!!')
-    config.init_status_df()  # 서비스 상태 초기화
+    config.revalidate_status_df(st.session_state.search_interval_min * 60)  # 최신 스냅샷으로 교체 + 백그라운드 갱신 요청
     st.rerun()
@@ -0,0 +1,60 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 알람 서비스 뉴스/번역 미리 가져오기
+# # # # # # # # # # # # # # #
+
+# 스냅샷이 발행될 때 새로 WARNING/DANGER 가 된 서비스의 뉴스와 제목 번역을 백그라운드에서 미리 가져온다.
+# 대시보드에서 타일을 눌러 뉴스 페이지로 넘어가면 공용 뉴스/번역 캐시에서 바로 그려진다.
+class NewsPrefetcher:
+    # prefetch_func : (지역, 서비스명) -> None, 뉴스와 번역을 공용 캐시에 채운다.
+    def __init__(self, prefetch_func, max_workers=4, max_per_snapshot=20):
+        self.prefetch_func = prefetch_func
+        self.max_per_snapshot = max_per_snapshot
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='news-prefetch')
+
+        self._lock = threading.Lock()
+        self._alarm_set_dict = dict()  # 지역 -> 알람이 이어지는 중이고 이미 제출한 서비스 set
+        self._pending_set = set()  # 작업 대기/진행 중인 (지역, 서비스명)
+        self.stats = {'submitted': 0, 'done': 0, 'error': 0}
+
+    # alarm_name_list : 이번 스냅샷의 알람 서비스 (우선순위 높은 순)
+    def on_snapshot(self, area, alarm_name_list):
+        with self._lock:
+            prev_alarm_set = self._alarm_set_dict.get(area, set())
+
+            entering_list = [name for name in alarm_name_list
+                             if name not in prev_alarm_set and (area, name) not in self._pending_set]
+            entering_list = entering_list[:self.max_per_snapshot]
+
+            # 이미 가져온 서비스(알람이 계속되는 것)와 이번에 제출한 서비스만 본 것으로 기록한다.
+            # 개수 제한으로 밀린 서비스는 다음 스냅샷에서 다시 새 알람으로 잡힌다.
+            self._alarm_set_dict[area] = (prev_alarm_set & set(alarm_name_list)) | set(entering_list)
+            self._pending_set.update((area, name) for name in entering_list)
+            self.stats['submitted'] += len(entering_list)
+
+        if len(entering_list) > 0:
+            logging.info(f'{area} 새 알람 서비스 뉴스 미리 가져오기 - {entering_list}')
+
+        for name in entering_list:
+            self._executor.submit(self._run, area, name)
+
+    def _run(self, area, name):
+        try:
+            self.prefetch_func(area, name)
+            with self._lock:
+                self.stats['done'] += 1
+        except Exception as e:
+            logging.error(f'{area} {name} 뉴스 미리 가져오기 실패 - {e}')
+            with self._lock:
+                self.stats['error'] += 1
+        finally:
+            with self._lock:
+                self._pending_set.discard((area, name))
@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import pandas as pd
+
+
+# # # # # # # # # # # # # # #
+# 호스트별 토큰 버킷 요청 제한
+# # # # # # # # # # # # # # #
+
+# 고정 sleep 대신 호스트마다 초당 rate 개씩 토큰이 차는 버킷을 두고, 요청마다 토큰 1개를 쓴다.
+# 토큰이 남아있으면 바로 나가고(최대 burst 개까지 몰아서), 없으면 다음 토큰이 찰 때까지만 기다린다.
+# 프로세스 안의 모든 세션/스레드가 같은 버킷을 공유한다.
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate  # 초당 토큰 수
+        self.burst = burst  # 최대로 쌓아둘 수 있는 토큰 수
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    # 토큰 1개를 예약하고, 그 토큰이 찰 때까지 기다린다. 리턴: 기다린 시간(초)
+    # 예약은 잠금 안에서 순서대로 하므로 먼저 온 요청이 먼저 나간다.
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait_sec = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+        if wait_sec > 0:
+            time.sleep(wait_sec)
+        return wait_sec
+
+
+class HostStats:
+    def __init__(self):
+        self.waiting = 0  # 토큰/동시 요청 자리를 기다리는 요청 수 (큐 길이)
+        self.running = 0
+        self.count = 0
+        self.total_wait_sec = 0.0
+        self.max_wait_sec = 0.0
+
+
+class HostRateLimiter:
+    # host_config_dict : {호스트: {'rate': 초당 요청 수, 'burst': 몰아서 보낼 수 있는 수, 'concurrency': 동시 요청 수}}
+    def __init__(self, host_config_dict, default_config):
+        self.host_config_dict = host_config_dict
+        self.default_config = default_config
+        self._lock = threading.Lock()
+        self._bucket_dict = dict()
+        self._semaphore_dict = dict()
+        self._stats_dict = dict()
+
+    @staticmethod
+    def normalize_host(host):
+        host = host.lower().split(':')[0]
+        return host[4:] if host.startswith('www.') else host
+
+    def _get_host_state(self, host):
+        with self._lock:
+            if host not in self._bucket_dict:
+                host_config = self.host_config_dict.get(host, self.default_config)
+                self._bucket_dict[host] = TokenBucket(host_config['rate'], host_config['burst'])
+                self._semaphore_dict[host] = threading.BoundedSemaphore(host_config['concurrency'])
+                self._stats_dict[host] = HostStats()
+            return self._bucket_dict[host], self._semaphore_dict[host], self._stats_dict[host]
+
+    # 해당 호스트의 동시 요청 자리와 토큰을 얻은 뒤 블록을 실행한다.
+    @contextmanager
+    def slot(self, host):
+        host = self.normalize_host(host)
+        bucket, semaphore, stats = self._get_host_state(host)
+
+        start_time = time.monotonic()
+        with self._lock:
+            stats.waiting += 1
+
+        with semaphore:
+            bucket.acquire()
+            wait_sec = time.monotonic() - start_time
+            with self._lock:
+                stats.waiting -= 1
+                stats.running += 1
+                stats.count += 1
+                stats.total_wait_sec += wait_sec
+                stats.max_wait_sec = max(stats.max_wait_sec, wait_sec)
+
+            try:
+                yield
+            finally:
+                with self._lock:
+                    stats.running -= 1
+
+    def get_stats_df(self):
+        with self._lock:
+            row_list = [{'host': host, 'waiting': stats.waiting, 'running': stats.running, 'count': stats.count,
+                         'avg_wait_sec': round(stats.total_wait_sec / stats.count, 3) if stats.count else 0.0,
+                         'max_wait_sec': round(stats.max_wait_sec, 3)}
+                        for host, stats in self._stats_dict.items()]
+        return pd.DataFrame(row_list)
+
+
+# # # # # # # # # # # # # # #
+# 호스트 제한에 맞춰 작업을 돌리는 스케줄러
+# # # # # # # # # # # # # # #
+
+
+# 작업을 스레드 풀에 넣되, 각 작업은 자기 호스트의 자리/토큰을 얻은 뒤에 실행된다.
+# 호스트가 여러 개면 각 호스트가 허용하는 만큼 동시에 진행된다.
+class RateLimitedScheduler:
+    def __init__(self, limiter, max_workers):
+        self.limiter = limiter
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rate-limited')
+
+    def _run(self, host, func, args, kwargs):
+        with self.limiter.slot(host):
+            return func(*args, **kwargs)
+
+    # 리턴: Future
+    def submit(self, host, func, *args, **kwargs):
+        return self._executor.submit(self._run, host, func, args, kwargs)
@@ -0,0 +1,322 @@
+import os
+import re
+import time
+import json
+import hashlib
+import logging
+import threading
+import warnings
+import numpy as np
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# 스파크라인 한 칸 = 15분
+SLOT_SEC = 15 * 60
+
+# 빈 구간(크롤링 못한 시간) 표시값
+MISSING = -1
+
+INDEX_FILE = 'index.json'
+
+# 저장 단계별 설정
+# slots : 한 칸(버킷)에 들어가는 15분 슬롯 수, retention_days : 보관 기간
+RAW = 'raw'
+HOURLY = 'hourly'
+DAILY = 'daily'
+TIER_DICT = {
+    RAW: {'slots': 1, 'retention_days': 14},
+    HOURLY: {'slots': 4, 'retention_days': 180},
+    DAILY: {'slots': 96, 'retention_days': 3650},
+}
+ROLLUP_TIER_LIST = [HOURLY, DAILY]
+
+# 집계 파일의 컬럼 순서
+ROLLUP_STAT_LIST = ['min', 'max', 'mean', 'p95']
+
+# 기간 조회 시 한번에 돌려줄 최대 포인트 수 (이보다 많으면 더 큰 단위의 집계에서 읽는다)
+MAX_QUERY_POINTS = 1000
+
+# 보관 기간이 지난 부분이 전체의 이 비율 이상 쌓이면 파일을 잘라낸다. (매번 다시 쓰지 않도록)
+RETENTION_COMPACT_RATIO = 0.1
+
+
+# epoch 초 -> 15분 슬롯 번호
+def get_slot(timestamp):
+    return int(timestamp // SLOT_SEC)
+
+
+def get_slot_time(slot):
+    return slot * SLOT_SEC
+
+
+# 서비스명 -> 파일명 (특수문자 제거 + 충돌 방지용 해시)
+def get_service_key(name):
+    safe_name = re.sub(r'[^0-9A-Za-z]+', '_', name).strip('_')[:40]
+    return f"{safe_name}_{hashlib.md5(name.encode('utf-8')).hexdigest()[:8]}"
+
+
+# # # # # # # # # # # # # # #
+# 리포트 수 이력 저장소
+# # # # # # # # # # # # # # #
+
+
+# (지역, 서비스) 별로 15분 단위 리포트 수를 int32 파일에 계속 덧붙여 저장한다.
+# - 크롤링할 때마다 받는 최근 24시간 스파크라인에서 이미 저장된 슬롯은 버리고 새 슬롯만 추가한다.
+#   아직 채워지는 중인 지금 슬롯은 다음 크롤링 때 다 찬 값으로 저장한다.
+# - 크롤링이 끊긴 구간은 MISSING 으로 채운다.
+# - 조회는 np.memmap 으로 필요한 구간만 읽어서 서비스당 메모리 사용량이 일정하다.
+#
+# - 주기적으로 시간/일 단위 min/max/mean/p95 집계를 만들고, 단계별 보관 기간이 지난 부분은 잘라낸다.
+# - 기간 조회는 포인트 수가 MAX_QUERY_POINTS 이하가 되는 가장 촘촘한 단계에서 읽는다.
+#
+# 폴더 구조: {base_dir}/{지역}/raw/{서비스 키}.i32, {base_dir}/{지역}/raw/index.json
+#           {base_dir}/{지역}/hourly/{서비스 키}.f32, {base_dir}/{지역}/daily/{서비스 키}.f32
+# index.json : {서비스명: {'key': 서비스 키, 'start_slot': 첫 슬롯 번호,
+#                          'hourly': {'start': 첫 버킷 번호, 'next': 다음에 집계할 버킷 번호}, 'daily': {...}}}
+class ReportHistory:
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._index_dict = dict()  # 지역 -> index.json 내용
+        self._last_rollup_dict = dict()  # 지역 -> 마지막 집계 시각
+
+    def _get_dir(self, area, tier=RAW):
+        return os.path.join(self.base_dir, area, tier)
+
+    def _load_index(self, area):
+        if area not in self._index_dict:
+            index_file = os.path.join(self._get_dir(area), INDEX_FILE)
+            if os.path.exists(index_file):
+                with open(index_file, encoding='utf-8') as f_:
+                    self._index_dict[area] = json.load(f_)
+            else:
+                self._index_dict[area] = dict()
+        return self._index_dict[area]
+
+    def _save_index(self, area):
+        index_file = os.path.join(self._get_dir(area), INDEX_FILE)
+        with open(index_file + '.tmp', 'w', encoding='utf-8') as f_:
+            json.dump(self._index_dict[area], f_, ensure_ascii=False)
+        os.replace(index_file + '.tmp', index_file)
+
+    def _get_file(self, area, info, tier=RAW):
+        return os.path.join(self._get_dir(area, tier), info['key'] + ('.i32' if tier == RAW else '.f32'))
+
+    # 단계별 파일을 (행, 컬럼) 배열로 연다. 리턴: (memmap 또는 None, 첫 행 번호)
+    # self._lock 을 잡은 상태에서 호출한다.
+    def _open_tier(self, area, info, tier):
+        if tier == RAW:
+            dtype, columns, start = np.int32, 1, info['start_slot']
+        else:
+            dtype, columns, start = np.float32, len(ROLLUP_STAT_LIST), info.get(tier, {}).get('start')
+
+        filename = self._get_file(area, info, tier)
+        if start is None or not os.path.exists(filename) or os.path.getsize(filename) == 0:
+            return None, start
+        return np.memmap(filename, dtype=dtype, mode='r').reshape(-1, columns), start
+
+    # 크롤링한 페이지 1개(서비스 x 96 포인트)를 이력에 합친다.
+    # values_matrix 의 마지막 열이 crawled_at 이 속한 슬롯이다.
+    # 이번에 실제로 크롤링한 행만 넘긴다. 이전 결과를 다시 넘기면 옛 값이 새 슬롯에 들어간다.
+    # 마지막 열(지금 슬롯)은 아직 리포트가 쌓이는 중이라 저장하지 않고, 다 찬 직전 슬롯까지만 덧붙인다.
+    # (한번 저장한 슬롯은 다시 쓰지 않으므로, 지금 슬롯을 넣으면 그 시점까지의 부분 합계가 그대로 남는다.)
+    def append_snapshot(self, area, name_list, values_matrix, crawled_at):
+        values_matrix = values_matrix[:, :-1]
+        end_slot = get_slot(crawled_at) - 1
+        num_points = values_matrix.shape[1]
+        appended_count = 0
+
+        with self._lock:
+            os.makedirs(self._get_dir(area), exist_ok=True)
+            index = self._load_index(area)
+
+            for name, values in zip(name_list, values_matrix):
+                info = index.get(name)
+                if info is None:
+                    # 처음 보는 서비스 - 스파크라인 전체를 저장
+                    info = {'key': get_service_key(name), 'start_slot': end_slot - num_points + 1}
+                    index[name] = info
+                    new_values = values
+                else:
+                    filename = self._get_file(area, info)
+                    stored_count = os.path.getsize(filename) // 4 if os.path.exists(filename) else 0
+                    last_slot = info['start_slot'] + stored_count - 1
+                    new_count = end_slot - last_slot
+
+                    if new_count <= 0:
+                        continue  # 새 슬롯 없음
+
+                    if new_count > num_points:
+                        # 스파크라인보다 오래 끊겼던 경우 빈 구간을 채운다.
+                        gap = np.full(new_count - num_points, MISSING, dtype=np.int32)
+                        new_values = np.concatenate([gap, values])
+                    else:
+                        new_values = values[-new_count:]
+
+                with open(self._get_file(area, info), 'ab') as f_:
+                    f_.write(np.ascontiguousarray(new_values, dtype=np.int32).tobytes())
+                appended_count += len(new_values)
+
+            self._save_index(area)
+
+        logging.info(f'{area} 리포트 이력 저장 - {len(name_list)}개 서비스, {appended_count}개 포인트 추가')
+
+    # 단계별 구간 [start, end] (raw는 슬롯, 집계는 버킷 번호) 읽기. 없는 구간은 MISSING.
+    # raw : (n,) int32, 집계 : (n, 4) float32
+    def read_range(self, area, name, start, end, tier=RAW):
+        with self._lock:
+            return self._read_range(area, self._load_index(area).get(name), start, end, tier)
+
+    def _read_range(self, area, info, start, end, tier):
+        if tier == RAW:
+            result = np.full((end - start + 1, 1), MISSING, dtype=np.int32)
+        else:
+            result = np.full((end - start + 1, len(ROLLUP_STAT_LIST)), MISSING, dtype=np.float32)
+
+        if info is not None:
+            stored, file_start = self._open_tier(area, info, tier)
+            if stored is not None:
+                # 파일 범위와 요청 범위가 겹치는 부분만 복사
+                from_row = max(start, file_start)
+                to_row = min(end, file_start + len(stored) - 1)
+                if from_row <= to_row:
+                    result[from_row - start:to_row - start + 1] = stored[from_row - file_start:to_row - file_start + 1]
+                del stored
+
+        return result[:, 0] if tier == RAW else result
+
+    # 슬롯 구간 [start_slot, end_slot] 의 리포트 수. 없는 구간은 MISSING.
+    def read_slots(self, area, name, start_slot, end_slot):
+        return self.read_range(area, name, start_slot, end_slot)
+
+    # 기간 조회. 포인트 수가 max_points 이하이면서 보관 기간 안에 드는 가장 촘촘한 단계를 고른다.
+    # stat : 집계 단계에서 쓸 값 (min/max/mean/p95)
+    # 리턴: (포인트 시각 배열(epoch 초), 리포트 수 배열 - 없는 구간은 NaN, 포인트 간격(초))
+    def query(self, area, name, start_ts, end_ts, max_points=MAX_QUERY_POINTS, stat='max'):
+        start_slot, end_slot = get_slot(start_ts), get_slot(end_ts)
+        now_slot = get_slot(time.time())
+
+        for tier in TIER_DICT:
+            slots = TIER_DICT[tier]['slots']
+            num_points = end_slot // slots - start_slot // slots + 1
+            in_retention = start_slot >= now_slot - TIER_DICT[tier]['retention_days'] * 96
+            if num_points <= max_points and in_retention:
+                break
+
+        slots = TIER_DICT[tier]['slots']
+        start, end = start_slot // slots, end_slot // slots
+        values = self.read_range(area, name, start, end, tier)
+        if tier != RAW:
+            values = values[:, ROLLUP_STAT_LIST.index(stat)]
+
+        values = values.astype(np.float32)
+        values[values == MISSING] = np.nan
+
+        point_times = get_slot_time(np.arange(start, end + 1) * slots)
+        return point_times, values, slots * SLOT_SEC
+
+    # # # # # # # # # #
+    # 집계 & 보관 기간
+    # # # # # # # # # #
+
+    # interval_sec 이 지났으면 지역 전체 서비스의 집계/보관 기간 정리를 실행한다.
+    def rollup_if_due(self, area, interval_sec):
+        if time.time() - self._last_rollup_dict.get(area, 0) < interval_sec:
+            return
+        self.rollup(area)
+
+    def rollup(self, area):
+        start_time = time.monotonic()
+        now_slot = get_slot(time.time())
+        rollup_count = 0
+
+        with self._lock:
+            index = self._load_index(area)
+            for tier in ROLLUP_TIER_LIST:
+                os.makedirs(self._get_dir(area, tier), exist_ok=True)
+
+            for name, info in index.items():
+                for tier in ROLLUP_TIER_LIST:
+                    rollup_count += self._rollup_service(area, info, tier)
+
+                # 집계가 끝난 뒤에 보관 기간이 지난 부분을 잘라낸다.
+                for tier in TIER_DICT:
+                    self._apply_retention(area, info, tier, now_slot)
+
+            self._save_index(area)
+            self._last_rollup_dict[area] = time.time()
+
+        logging.info(f'{area} 리포트 이력 집계 완료 - {len(index)}개 서비스, {rollup_count}개 버킷, '
+                     f'{time.monotonic() - start_time:.2f}초')
+
+    # 원본에서 끝까지 다 찬 버킷들만 집계해서 덧붙인다. 리턴: 추가한 버킷 수
+    def _rollup_service(self, area, info, tier):
+        slots = TIER_DICT[tier]['slots']
+        raw_file = self._get_file(area, info)
+        if not os.path.exists(raw_file):
+            return 0
+
+        raw_end_slot = info['start_slot'] + os.path.getsize(raw_file) // 4 - 1
+        last_bucket = (raw_end_slot + 1) // slots - 1  # 다 찬 마지막 버킷
+        tier_info = info.setdefault(tier, {'start': info['start_slot'] // slots,
+                                           'next': info['start_slot'] // slots})
+
+        if tier_info['next'] > last_bucket:
+            return 0
+
+        from_bucket, to_bucket = tier_info['next'], last_bucket
+        raw_values = self._read_range(area, info, from_bucket * slots, (to_bucket + 1) * slots - 1, RAW)
+
+        bucket_matrix = raw_values.reshape(-1, slots).astype(np.float32)
+        bucket_matrix[bucket_matrix == MISSING] = np.nan
+
+        # 전부 비어있는 버킷은 NaN 으로 남긴다.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            rollup_matrix = np.stack([
+                np.nanmin(bucket_matrix, axis=1),
+                np.nanmax(bucket_matrix, axis=1),
+                np.nanmean(bucket_matrix, axis=1),
+                np.nanpercentile(bucket_matrix, 95, axis=1),
+            ], axis=1).astype(np.float32)
+        rollup_matrix[np.isnan(rollup_matrix)] = MISSING
+
+        with open(self._get_file(area, info, tier), 'ab') as f_:
+            f_.write(np.ascontiguousarray(rollup_matrix).tobytes())
+
+        tier_info['next'] = to_bucket + 1
+        return len(rollup_matrix)
+
+    def _apply_retention(self, area, info, tier, now_slot):
+        slots = TIER_DICT[tier]['slots']
+        keep_from = (now_slot - TIER_DICT[tier]['retention_days'] * 96) // slots
+
+        if tier == RAW:
+            # 아직 집계하지 않은 원본은 남겨둔다.
+            keep_from = min([keep_from] + [info[rollup_tier]['next'] * TIER_DICT[rollup_tier]['slots']
+                                           for rollup_tier in ROLLUP_TIER_LIST if rollup_tier in info])
+
+        stored, file_start = self._open_tier(area, info, tier)
+        if stored is None:
+            return
+
+        drop_count = min(keep_from - file_start, len(stored))
+        if drop_count <= 0 or drop_count < len(stored) * RETENTION_COMPACT_RATIO:
+            del stored
+            return
+
+        # 남길 부분만 임시 파일에 쓰고 교체한다.
+        filename = self._get_file(area, info, tier)
+        with open(filename + '.tmp', 'wb') as f_:
+            f_.write(np.ascontiguousarray(stored[drop_count:]).tobytes())
+        del stored
+        os.replace(filename + '.tmp', filename)
+
+        if tier == RAW:
+            info['start_slot'] += drop_count
+        else:
+            info[tier]['start'] += drop_count
+        logging.info(f"{area} {info['key']} {tier} 보관 기간 정리 - {drop_count}개 삭제")
@@ -0,0 +1,145 @@
+import logging
+import re
+import time
+from collections import deque
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 뉴스 제목 -> 서비스 역매칭 (Aho-Corasick)
+# # # # # # # # # # # # # # #
+
+# 서비스명/별칭 전체로 오토마톤을 1번 만들어두면, 제목 1개를 글자 수에 비례하는 시간에 한번만 훑어서
+# 등장하는 모든 서비스를 찾는다. (서비스 수와 무관)
+# 단어 중간에 걸린 매칭(예: 'Xbox' 안의 'X')은 앞뒤 글자가 영숫자인지 확인해서 버린다.
+# 겹치는 매칭('Google Cloud' 안의 'Google')은 왼쪽부터 가장 긴 것 하나만 남긴다.
+
+MIN_PATTERN_LEN = 3  # 이보다 짧은 서비스명은 별칭으로 직접 등록한 경우에만 찾는다.
+
+# 일반 단어와 같은 서비스명/별칭은 제목에서 대문자로 시작할 때만 서비스로 본다. ('Power line down' 의 'line')
+COMMON_WORD_SET = {
+    'box', 'buffer', 'chase', 'consolidated', 'duo', 'forever', 'frontier', 'grande', 'honey', 'hue',
+    'indeed', 'line', 'max', 'mega', 'nice', 'opera', 'ring', 'scratch', 'securely', 'sense', 'slack',
+    'spectrum', 'square', 'steam', 'visible', 'webs', 'wow', 'x', 'zoom',
+}
+
+
+# 소문자 + 공백 하나로 정리
+def normalize_text(text):
+    return ' '.join(text.casefold().split())
+
+
+# normalize_text 와 같은 결과 + 글자마다 원문에서의 위치 (공백은 -1)
+def normalize_text_with_index(text):
+    char_list = []
+    index_list = []
+    for word_match in re.finditer(r'\S+', text):
+        if char_list:
+            char_list.append(' ')
+            index_list.append(-1)
+        for idx in range(word_match.start(), word_match.end()):
+            for char in text[idx].casefold():
+                char_list.append(char)
+                index_list.append(idx)
+    return ''.join(char_list), index_list
+
+
+# 서비스명에서 자동으로 만드는 별칭
+# 'X (Twitter)' -> 'x', 'twitter' / 'Outlook / Hotmail' -> 'outlook', 'hotmail'
+def get_auto_alias_list(name):
+    alias_list = [name]
+    alias_list += re.findall(r'\(([^)]+)\)', name)
+    base_name = re.sub(r'\([^)]*\)', ' ', name)
+    alias_list += re.split(r'\s*/\s*', base_name)
+    return [normalize_text(alias) for alias in alias_list if len(normalize_text(alias)) >= MIN_PATTERN_LEN]
+
+
+class AhoCorasick:
+    def __init__(self, pattern_list):
+        self._goto_list = [dict()]  # 상태 -> {글자: 다음 상태}
+        self._fail_list = [0]
+        self._output_list = [[]]  # 상태 -> 끝나는 패턴 번호 리스트
+        self.pattern_list = pattern_list
+
+        for pattern_id, pattern in enumerate(pattern_list):
+            state = 0
+            for char in pattern:
+                next_state = self._goto_list[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto_list)
+                    self._goto_list[state][char] = next_state
+                    self._goto_list.append(dict())
+                    self._fail_list.append(0)
+                    self._output_list.append([])
+                state = next_state
+            self._output_list[state].append(pattern_id)
+
+        # 너비 우선으로 실패 링크 연결
+        queue = deque(self._goto_list[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto_list[state].items():
+                queue.append(next_state)
+                fail_state = self._fail_list[state]
+                while fail_state and char not in self._goto_list[fail_state]:
+                    fail_state = self._fail_list[fail_state]
+                self._fail_list[next_state] = self._goto_list[fail_state].get(char, 0)
+                self._output_list[next_state] += self._output_list[self._fail_list[next_state]]
+
+    # 리턴: (시작 위치, 끝 위치(미포함), 패턴 번호) 제너레이터
+    def iter_matches(self, text):
+        state = 0
+        for idx, char in enumerate(text):
+            while state and char not in self._goto_list[state]:
+                state = self._fail_list[state]
+            state = self._goto_list[state].get(char, 0)
+            for pattern_id in self._output_list[state]:
+                yield idx + 1 - len(self.pattern_list[pattern_id]), idx + 1, pattern_id
+
+
+class ServiceMatcher:
+    # alias_dict : {서비스명: [별칭, ...]} - 서비스명 자체와 자동 별칭은 따로 넣지 않아도 된다.
+    def __init__(self, name_list, alias_dict=None):
+        start_time = time.perf_counter()
+        alias_dict = alias_dict or dict()
+
+        pattern_dict = dict()  # 패턴 -> 서비스명 set
+        for name in name_list:
+            pattern_list = get_auto_alias_list(name) + [normalize_text(alias) for alias in alias_dict.get(name, [])]
+            for pattern in pattern_list:
+                if pattern:
+                    pattern_dict.setdefault(pattern, set()).add(name)
+
+        self._pattern_list = list(pattern_dict)
+        self._name_set_list = [pattern_dict[pattern] for pattern in self._pattern_list]
+        self._automaton = AhoCorasick(self._pattern_list)
+
+        logging.info(f'서비스 매처 생성 - {len(name_list)}개 서비스, {len(self._pattern_list)}개 패턴, '
+                     f'{(time.perf_counter() - start_time) * 1000:.0f}ms')
+
+    # 리턴: 제목에 단어 단위로 등장하는 서비스명 set
+    def match(self, text):
+        norm_text, index_list = normalize_text_with_index(text)
+
+        match_list = []
+        for start, end, pattern_id in self._automaton.iter_matches(norm_text):
+            if start > 0 and norm_text[start - 1].isalnum():
+                continue
+            if end < len(norm_text) and norm_text[end].isalnum():
+                continue
+            if self._pattern_list[pattern_id] in COMMON_WORD_SET and not text[index_list[start]].isupper():
+                continue
+            match_list.append((start, end, pattern_id))
+
+        # 왼쪽부터, 같은 위치면 긴 것부터 보면서 앞서 고른 매칭과 겹치는 것은 버린다.
+        name_set = set()
+        last_end = 0
+        for start, end, pattern_id in sorted(match_list, key=lambda item: (item[0], -item[1])):
+            if start < last_end:
+                continue
+            name_set |= self._name_set_list[pattern_id]
+            last_end = end
+        return name_set
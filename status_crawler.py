@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from typing import NamedTuple, Any
+import get_downdetector_web
+import anomaly_detector
+import outage_cluster
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# 지역별 서비스 상태 스냅샷
+class StatusSnapshot(NamedTuple):
+    area: str
+    df: Any  # pandas DataFrame
+    updated_at: float  # 발행 시각 (epoch 초). 페이지별 실제 크롤링 시각은 df 의 CRAWLED_AT 컬럼
+    stale: bool = False  # 디스크에서 불러온 이전 데이터 여부
+    values: Any = None  # 서비스 x 포인트 리포트 수 int32 행렬 (df의 행 순서와 같음)
+    index: Any = None  # (지역, 서비스명) casefold -> 행 번호
+    cluster_list: Any = None  # 같이 급증한 서비스 묶음 (outage_cluster.OutageCluster 리스트)
+
+
+# # # # # # # # # # # # # # #
+# 모든 세션이 공유하는 백그라운드 크롤러
+# # # # # # # # # # # # # # #
+
+
+# 크롤러 스레드 1개가 주기적으로 전체 지역을 크롤링해서 스냅샷을 발행한다.
+# 세션들은 발행된 스냅샷을 읽기만 하므로, 대시보드를 몇 개 띄우든 크롤링 부하는 일정하다.
+class StatusCrawler:
+    def __init__(self, crawl_func, area_list, interval_sec, on_publish=None):
+        self.crawl_func = crawl_func  # area_list -> {지역: df 또는 None}
+        self.area_list = list(area_list)
+        self.interval_sec = interval_sec
+        self.on_publish = on_publish  # 발행된 StatusSnapshot 을 받는 콜백
+
+        self._lock = threading.Lock()
+        self._published = threading.Condition(self._lock)
+        self._snapshot_dict = dict()
+        self._refresh_event = threading.Event()
+        self._thread = None
+        self.crawling = False  # 지금 크롤링 중인지 여부
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='status-crawler', daemon=True)
+        self._thread.start()
+        logging.info(f'상태 크롤러 시작 - {self.area_list} {self.interval_sec}초 주기')
+
+    def _run(self):
+        while True:
+            self.crawl_once()
+
+            # 다음 주기까지 대기. 새로고침 요청이 오면 바로 깨어난다.
+            self._refresh_event.wait(self.interval_sec)
+            self._refresh_event.clear()
+
+    def crawl_once(self):
+        self.crawling = True
+        try:
+            status_df_dict = self.crawl_func(self.area_list)
+        except Exception as e:
+            logging.error(f'상태 크롤러 크롤링 에러 - {e}')
+            return
+        finally:
+            self.crawling = False
+
+        for area, df_ in status_df_dict.items():
+            if df_ is None or len(df_) == 0:
+                # 실패한 지역은 이전 스냅샷을 그대로 유지한다.
+                logging.error(f'{area} 크롤링 실패 - 이전 스냅샷 유지')
+                continue
+            self.publish(area, df_)
+
+    # 디스크에 저장해둔 마지막 스냅샷을 stale 표시로 올려둔다. (첫 크롤링 전까지 사용)
+    def load_stale_snapshot(self, area, df_, updated_at):
+        with self._lock:
+            if area in self._snapshot_dict:
+                return  # 이미 새 스냅샷이 있음
+            values_matrix = get_downdetector_web.make_values_matrix(df_)
+            anomaly_detector.add_anomaly_columns(df_, values_matrix)
+            self._snapshot_dict[area] = StatusSnapshot(area=area, df=df_, updated_at=updated_at, stale=True,
+                                                       values=values_matrix,
+                                                       index=get_downdetector_web.make_service_index(df_),
+                                                       cluster_list=outage_cluster.find_outage_clusters(
+                                                           df_, values_matrix))
+            self._published.notify_all()
+        logging.info(f'{area} 저장된 스냅샷 로딩 - {len(df_)}개 서비스 (stale)')
+
+    def publish(self, area, df_):
+        values_matrix = get_downdetector_web.make_values_matrix(df_)
+        anomaly_detector.add_anomaly_columns(df_, values_matrix)
+        snapshot = StatusSnapshot(area=area, df=df_, updated_at=time.time(), values=values_matrix,
+                                  index=get_downdetector_web.make_service_index(df_),
+                                  cluster_list=outage_cluster.find_outage_clusters(df_, values_matrix))
+
+        # 스냅샷은 통째로 교체한다. 읽는 쪽은 항상 이전 것 또는 새 것 하나를 온전히 본다.
+        with self._lock:
+            self._snapshot_dict[area] = snapshot
+            self._published.notify_all()
+        logging.info(f'{area} 스냅샷 발행 - {len(df_)}개 서비스')
+
+        if self.on_publish is not None:
+            try:
+                self.on_publish(snapshot)
+            except Exception as e:
+                logging.error(f'{area} 스냅샷 발행 후처리 에러 - {e}')
+
+    def get_snapshot(self, area):
+        with self._lock:
+            return self._snapshot_dict.get(area)
+
+    # 첫 스냅샷이 나올 때까지 기다린다. (앱 최초 기동 시에만 해당)
+    def wait_for_snapshot(self, area, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            while area not in self._snapshot_dict:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._published.wait(remaining)
+            return self._snapshot_dict[area]
+
+    # 다음 주기를 기다리지 않고 바로 크롤링하도록 요청한다.
+    def request_refresh(self):
+        self._refresh_event.set()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# 테스트에서 저장소 루트의 모듈을 바로 import 할 수 있게 한다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import anomaly_detector
+import get_downdetector_web
+
+
+NUM_NOISE = 10000
+NUM_SPIKE = 50
+MAX_FALSE_POSITIVE = NUM_NOISE // 1000  # 잡음만 있는 서비스의 0.1% 이하
+
+
+# 잡음(포아송) 서비스 NUM_NOISE 개 + 최근 30분 급증 서비스 NUM_SPIKE 개
+def make_matrix(lam, seed=0):
+    rng = np.random.default_rng(seed)
+    values_matrix = rng.poisson(lam, (NUM_NOISE + NUM_SPIKE, get_downdetector_web.SPARKLINE_POINTS))
+    values_matrix[NUM_NOISE:, -2:] += int(20 * np.sqrt(lam)) + 50
+    return values_matrix.astype(np.int32)
+
+
+@pytest.mark.parametrize('lam', [20, 500])
+def test_noise_false_positives_are_bounded(lam):
+    _, _, level_codes = anomaly_detector.detect_anomalies(make_matrix(lam))
+
+    assert (level_codes[:NUM_NOISE] >= 1).sum() <= MAX_FALSE_POSITIVE
+    assert (level_codes[NUM_NOISE:] == 2).all()
+
+
+def test_steady_ramp_is_warning():
+    rng = np.random.default_rng(1)
+    values_matrix = rng.poisson(20, (100, get_downdetector_web.SPARKLINE_POINTS)).astype(np.int32)
+    values_matrix[:, -4:] += np.array([5, 12, 20, 30], dtype=np.int32)
+
+    _, _, level_codes = anomaly_detector.detect_anomalies(values_matrix)
+    assert (level_codes >= 1).mean() >= 0.95
+
+
+def test_quiet_service_is_never_flagged():
+    values_matrix = np.zeros((3, get_downdetector_web.SPARKLINE_POINTS), dtype=np.int32)
+    values_matrix[:, -2:] = 5  # 기준선 0 에서 튀어도 리포트 수가 MIN_REPORTS 미만
+
+    _, _, level_codes = anomaly_detector.detect_anomalies(values_matrix)
+    assert not level_codes.any()
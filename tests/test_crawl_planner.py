@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import crawl_planner
+import get_downdetector_web
+
+
+MIN_SEC, BASE_SEC, MAX_SEC = 60, 180, 900
+NUM_SERVICES = 150
+
+
+def make_page(class_list=None):
+    class_list = class_list or [get_downdetector_web.SUCCESS] * NUM_SERVICES
+    return pd.DataFrame({get_downdetector_web.NAME: [f'Service {i}' for i in range(NUM_SERVICES)],
+                         get_downdetector_web.CLASS: class_list})
+
+
+def make_noise(rng):
+    return rng.poisson(20, (NUM_SERVICES, get_downdetector_web.SPARKLINE_POINTS)).astype(np.int32)
+
+
+def test_quiet_page_backs_off_to_max_interval():
+    rng = np.random.default_rng(0)
+    planner = crawl_planner.CrawlPlanner(MIN_SEC, BASE_SEC, MAX_SEC)
+    df_ = make_page()
+
+    now = 1000.0
+    interval_list = []
+    for _ in range(50):
+        interval = planner.update('page', df_, make_noise(rng), set(), now=now)
+        interval_list.append(interval)
+        now += interval
+
+    # 알람도 감시 서비스도 없는 페이지는 잡음만으로 기본 주기에 붙잡히지 않는다.
+    assert interval_list.count(MAX_SEC) >= 45
+
+
+def test_alarm_and_watch_keep_page_hot():
+    rng = np.random.default_rng(0)
+    planner = crawl_planner.CrawlPlanner(MIN_SEC, BASE_SEC, MAX_SEC)
+    class_list = [get_downdetector_web.WARNING] + [get_downdetector_web.SUCCESS] * (NUM_SERVICES - 1)
+    df_ = make_page(class_list)
+
+    assert planner.update('page', df_, make_noise(rng), set(), now=1000) == BASE_SEC
+    assert planner.update('page', df_, make_noise(rng), {'Service 0'}, now=1180) == MIN_SEC
+    assert planner.update('page', make_page(), make_noise(rng), {'Service 0'}, now=1240) == BASE_SEC
+
+
+def test_expedite_keeps_backoff_of_quiet_pages():
+    rng = np.random.default_rng(0)
+    planner = crawl_planner.CrawlPlanner(MIN_SEC, BASE_SEC, MAX_SEC)
+    planner._interval_dict['page'] = MAX_SEC
+    crawled_at = 1000.0
+    planner.update('page', make_page(), make_noise(rng), set(), now=crawled_at)
+
+    # 대시보드 새로고침(5분)은 15분 주기로 늘어난 페이지를 당기지 않는다.
+    assert planner.expedite(['page', 'new page'], 300, now=crawled_at + 360) == []
+    assert planner.get_due_list(['page'], now=crawled_at + 360) == []
+
+    # 주기가 지난 페이지만 바로 크롤링한다.
+    assert planner.expedite(['page'], 300, now=crawled_at + MAX_SEC) == ['page']
+    assert planner.get_due_list(['page'], now=crawled_at + MAX_SEC) == ['page']
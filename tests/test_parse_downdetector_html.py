@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import get_downdetector_web
+
+
+# 저장해둔 다운디텍터 카테고리 페이지로 HTTP + lxml 파서를 확인한다.
+FIXTURE_FILE = os.path.join(os.path.dirname(__file__), 'fixtures', 'downdetector_category.html')
+
+
+def load_fixture():
+    with open(FIXTURE_FILE, 'rb') as f_:
+        return f_.read()
+
+
+def test_parse_extracts_name_values_class():
+    data = get_downdetector_web.parse_downdetector_html(load_fixture(), 'fixture', 'US')
+    item_dict = {item[get_downdetector_web.NAME]: item for item in data}
+
+    # 서비스명은 앞뒤 공백을 떼고 html 엔티티를 풀어서 받는다.
+    assert list(item_dict) == ['AT&T', 'Verizon', 'T-Mobile', 'Spectrum', 'Short Values']
+
+    assert item_dict['AT&T'][get_downdetector_web.CLASS] == get_downdetector_web.DANGER
+    assert item_dict['Verizon'][get_downdetector_web.CLASS] == get_downdetector_web.WARNING
+    assert item_dict['T-Mobile'][get_downdetector_web.CLASS] == get_downdetector_web.SUCCESS
+    # 영향도 클래스가 없는 스파크라인은 SUCCESS 로 본다.
+    assert item_dict['Spectrum'][get_downdetector_web.CLASS] == get_downdetector_web.SUCCESS
+
+    values = get_downdetector_web.parse_data_values(item_dict['AT&T'][get_downdetector_web.VALUES])
+    assert values.dtype == np.int32
+    assert len(values) == get_downdetector_web.SPARKLINE_POINTS
+    assert values[:2].tolist() == [20, 19]
+    assert values[-4:].tolist() == [320, 622, 921, 1222]
+
+    # 짧은 값 목록은 앞쪽을 0으로 채운다.
+    values = get_downdetector_web.parse_data_values(item_dict['Short Values'][get_downdetector_web.VALUES])
+    assert values[-3:].tolist() == [1, 2, 3]
+    assert not values[:-3].any()
+
+
+def test_parse_skips_broken_caption():
+    data = get_downdetector_web.parse_downdetector_html(load_fixture(), 'fixture', 'US')
+    assert 'Broken Service' not in [item[get_downdetector_web.NAME] for item in data]
+
+
+def test_parse_blocked_page_returns_empty():
+    # 차단 페이지처럼 서비스 카드가 없으면 빈 목록 -> 셀레니움으로 넘어간다.
+    html = b'<html><body><h1>Access denied</h1></body></html>'
+    assert get_downdetector_web.parse_downdetector_html(html, 'fixture', 'US') == []
+
+
+def test_make_status_df_sorts_by_impact():
+    data = get_downdetector_web.parse_downdetector_html(load_fixture(), 'fixture', 'US')
+    df_ = get_downdetector_web.make_status_df(data, 'US')
+
+    assert df_[get_downdetector_web.NAME].tolist()[:2] == ['AT&T', 'Verizon']
+    assert (df_[get_downdetector_web.AREA] == 'US').all()
+    assert len(df_) == 5
@@ -0,0 +1,26 @@
+import prefetcher
+
+
+AREA = 'US'
+
+
+def run_snapshots(alarm_name_list_list, max_per_snapshot):
+    fetched_list = []
+    news_prefetcher = prefetcher.NewsPrefetcher(lambda area, name: fetched_list.append(name),
+                                                max_workers=1, max_per_snapshot=max_per_snapshot)
+    for alarm_name_list in alarm_name_list_list:
+        news_prefetcher.on_snapshot(AREA, alarm_name_list)
+        # 다음 스냅샷 전에 제출한 작업을 끝내둔다.
+        news_prefetcher._executor.submit(lambda: None).result()
+    news_prefetcher._executor.shutdown(wait=True)
+    return fetched_list
+
+
+def test_capped_out_alarms_are_fetched_on_next_snapshot():
+    fetched_list = run_snapshots([['a', 'b', 'c', 'd']] * 3, max_per_snapshot=2)
+    assert fetched_list == ['a', 'b', 'c', 'd']
+
+
+def test_continuing_alarm_is_fetched_once_and_again_after_it_clears():
+    fetched_list = run_snapshots([['a'], ['a', 'b'], ['b'], ['a', 'b']], max_per_snapshot=20)
+    assert fetched_list == ['a', 'b', 'a']
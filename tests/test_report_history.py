@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+import report_history
+
+
+# 하루 경계에 맞춘 기준 시각 (일 단위 버킷 0번의 시작)
+BASE_TS = 19675 * 86400
+BASE_SLOT = report_history.get_slot(BASE_TS)
+DAY_SEC = 86400
+AREA = 'US'
+NAME = 'Svc'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [float(BASE_TS)]
+    monkeypatch.setattr(report_history.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def history(tmp_path):
+    return report_history.ReportHistory(str(tmp_path))
+
+
+# ts 에 크롤링한 스파크라인을 덧붙인다. 각 슬롯의 값은 (슬롯 번호 - BASE_SLOT) 이라 어느 크롤링에서 봐도 같다.
+def append_at(history, clock, ts):
+    clock[0] = ts
+    now_slot = report_history.get_slot(ts)
+    values = np.arange(now_slot - 95, now_slot + 1, dtype=np.int32) - BASE_SLOT
+    history.append_snapshot(AREA, [NAME], values[None, :], ts)
+
+
+# BASE_TS 기준 상대 번호(원본은 슬롯, 집계는 버킷)로 읽기
+def read(history, start, end, tier=report_history.RAW):
+    base = BASE_SLOT // report_history.TIER_DICT[tier]['slots']
+    return history.read_range(AREA, NAME, base + start, base + end, tier)
+
+
+# 하루 0번 슬롯부터 빈틈없이 days 일치를 쌓는다.
+def fill_days(history, clock, days, step_sec=12 * 3600):
+    for ts in range(BASE_TS + 95 * 900 + 10, BASE_TS + days * DAY_SEC + 11, step_sec):
+        append_at(history, clock, ts)
+    append_at(history, clock, BASE_TS + days * DAY_SEC + 10)
+
+
+def test_append_keeps_only_new_completed_slots_and_fills_gaps(history, clock):
+    # 첫 크롤링 : 지금 슬롯(95)은 아직 채워지는 중이라 0..94 만 저장
+    append_at(history, clock, BASE_TS + 95 * 900 + 10)
+    assert read(history, 0, 95).tolist() == list(range(95)) + [report_history.MISSING]
+
+    # 3일 뒤 크롤링 : 스파크라인보다 오래 끊긴 구간은 MISSING
+    append_at(history, clock, BASE_TS + 3 * DAY_SEC + 10)
+    stored = read(history, 0, 287)
+    assert stored[:95].tolist() == list(range(95))
+    assert (stored[95:193] == report_history.MISSING).all()
+    assert stored[193:].tolist() == list(range(193, 288))
+
+    # 1시간 뒤 크롤링 : 겹치는 구간은 버리고 새 슬롯 4개만 추가
+    append_at(history, clock, BASE_TS + 3 * DAY_SEC + 3600 + 10)
+    assert read(history, 286, 292).tolist() == [286, 287, 288, 289, 290, 291, report_history.MISSING]
+
+    # 같은 슬롯 안에서 다시 크롤링하면 아무것도 추가하지 않는다.
+    append_at(history, clock, BASE_TS + 3 * DAY_SEC + 3600 + 500)
+    assert read(history, 292, 292).tolist() == [report_history.MISSING]
+
+
+def test_rollup_hourly_and_daily_values(history, clock):
+    fill_days(history, clock, 2, step_sec=3600)
+    history.rollup(AREA)
+
+    hourly = read(history, 0, 48, report_history.HOURLY)
+    # 0번 시간 버킷 = 슬롯 0..3 / min, max, mean, p95
+    assert hourly[0].tolist() == pytest.approx([0, 3, 1.5, 2.85])
+    assert hourly[5].tolist() == pytest.approx([20, 23, 21.5, 22.85])
+    # 다 차지 않은 버킷은 아직 집계하지 않는다.
+    assert (hourly[48] == report_history.MISSING).all()
+
+    daily = read(history, 0, 2, report_history.DAILY)
+    assert daily[0].tolist() == pytest.approx([0, 95, 47.5, 90.25])
+    assert daily[1].tolist() == pytest.approx([96, 191, 143.5, 186.25])
+    assert (daily[2] == report_history.MISSING).all()
+
+    # 다시 집계해도 이미 집계한 버킷은 그대로다.
+    history.rollup(AREA)
+    assert read(history, 0, 1, report_history.DAILY).tolist() == daily[:2].tolist()
+
+
+def test_retention_trims_raw_only_after_rollup(history, clock):
+    fill_days(history, clock, 20)
+    now_slot = report_history.get_slot(clock[0])
+    keep_from = now_slot - report_history.TIER_DICT[report_history.RAW]['retention_days'] * 96 - BASE_SLOT
+
+    history.rollup(AREA)
+
+    # 원본은 보관 기간(14일) 이전 부분이 잘려나가고, 그 구간은 집계 단계에 남아 있다.
+    raw = read(history, keep_from - 1, keep_from)
+    assert raw.tolist() == [report_history.MISSING, keep_from]
+    assert read(history, 0, 0, report_history.HOURLY)[0].tolist() == pytest.approx([0, 3, 1.5, 2.85])
+    assert read(history, 0, 0, report_history.DAILY)[0].tolist() == pytest.approx([0, 95, 47.5, 90.25])
+
+    # 잘라낸 뒤에도 새 크롤링은 이어서 붙는다.
+    append_at(history, clock, clock[0] + 3600)
+    assert read(history, now_slot - BASE_SLOT - 1, now_slot - BASE_SLOT + 3).tolist() == \
+        list(range(now_slot - BASE_SLOT - 1, now_slot - BASE_SLOT + 4))
+
+
+def test_retention_keeps_raw_that_is_not_rolled_up(history, clock):
+    fill_days(history, clock, 20)
+
+    # 집계 없이 보관 기간 정리만 하면, 아직 집계하지 않은 원본은 남겨둔다.
+    with history._lock:
+        info = history._load_index(AREA)[NAME]
+        info[report_history.HOURLY] = {'start': 0, 'next': 0}
+        history._apply_retention(AREA, info, report_history.RAW, report_history.get_slot(clock[0]))
+    assert read(history, 0, 1).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize('hours, step_sec, num_points', [
+    (24, 900, 97),  # 원본
+    (24 * 7, 900, 673),  # 원본 (1000개 이하)
+    (24 * 30, 3600, 721),  # 시간 단위 (원본 2880개 > 1000)
+    (24 * 365 * 2, 86400, 731),  # 일 단위
+])
+def test_query_picks_finest_tier_that_fits(history, clock, hours, step_sec, num_points):
+    fill_days(history, clock, 20)
+    history.rollup(AREA)
+
+    end_ts = clock[0]
+    point_times, values, result_step_sec = history.query(AREA, NAME, end_ts - hours * 3600, end_ts)
+
+    assert result_step_sec == step_sec
+    assert len(values) == len(point_times) == num_points
+    assert np.diff(point_times).tolist() == [step_sec] * (num_points - 1)
+
+    # 마지막 다 찬 구간의 값은 그 단계의 최대값이다.
+    last_slot = report_history.get_slot(end_ts) - 1 - BASE_SLOT
+    last_row = (last_slot + 1) * 900 // step_sec - 1 - (point_times[0] - BASE_TS) // step_sec
+    assert values[last_row] == last_slot
+
+
+def test_query_beyond_raw_retention_reads_rollup(history, clock):
+    fill_days(history, clock, 20)
+    history.rollup(AREA)
+
+    # 7일 전 ~ 15일 전 구간은 포인트 수는 적어도 원본 보관 기간 밖이라 시간 단위에서 읽는다.
+    end_ts = clock[0] - 7 * DAY_SEC
+    point_times, values, step_sec = history.query(AREA, NAME, end_ts - 8 * DAY_SEC, end_ts)
+    assert step_sec == 3600
+    assert values[0] == (point_times[0] - BASE_TS) // 900 + 3
@@ -0,0 +1,48 @@
+import pytest
+import service_matcher
+
+
+NAME_LIST = ['Amazon', 'Amazon Prime Video', 'Amazon Web Services', 'AWS', 'Gmail', 'Google', 'Google Cloud',
+             'Google Maps', 'Line', 'Steam', 'X (Twitter)', 'Xbox Live', 'Zoom']
+ALIAS_DICT = {
+    'Amazon Web Services': ['AWS'],
+    'AWS': ['Amazon Web Services'],
+    'Google Cloud': ['GCP', 'Google Cloud Platform'],
+    'X (Twitter)': ['X', 'Twitter'],
+}
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return service_matcher.ServiceMatcher(NAME_LIST, ALIAS_DICT)
+
+
+@pytest.mark.parametrize('title, name_set', [
+    # 겹치는 매칭은 가장 긴 것만
+    ('Google Cloud outage affects Gmail users', {'Google Cloud', 'Gmail'}),
+    ('Amazon Prime Video down for thousands', {'Amazon Prime Video'}),
+    ('Google Maps not loading', {'Google Maps'}),
+    ('Google Cloud Platform incident', {'Google Cloud'}),
+    ('Amazon Web Services outage', {'Amazon Web Services', 'AWS'}),
+    # 따로 등장하면 각각
+    ('Google and Amazon report outages', {'Google', 'Amazon'}),
+    # 단어 중간 매칭은 버린다.
+    ('Xbox Live is down', {'Xbox Live'}),
+    ('Googleplex evacuated', set()),
+    # 일반 단어는 대문자로 시작할 때만
+    ('Power line down after storm', set()),
+    ('Zoom in on the outage as steam pipe bursts', {'Zoom'}),
+    ('LINE and Steam down in Japan', {'Line', 'Steam'}),
+    ('X outage: Twitter users see errors', {'X (Twitter)'}),
+    ('Prices up 3 x in a year', set()),
+])
+def test_match(matcher, title, name_set):
+    assert matcher.match(title) == name_set
+
+
+def test_normalize_text_with_index_maps_back_to_original():
+    text = '  Straße \t Down '
+    norm_text, index_list = service_matcher.normalize_text_with_index(text)
+    assert norm_text == service_matcher.normalize_text(text) == 'strasse down'
+    assert len(index_list) == len(norm_text)
+    assert [text[idx] for idx in index_list[norm_text.index('down'):]] == list('Down')
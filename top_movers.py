@@ -0,0 +1,88 @@
+import heapq
+import threading
+import time
+from itertools import chain
+from typing import NamedTuple
+import numpy as np
+import get_downdetector_web
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 급상승 서비스 순위 (감시 목록과 상관없이 크롤링한 전체 서비스 대상)
+# # # # # # # # # # # # # # #
+
+# 카테고리 페이지가 하나 도착할 때마다 그 페이지만 계산해서 페이지별 상위 max_size 개를 갱신한다.
+# 전체 순위는 페이지별 상위 목록들을 크기 제한 힙(heapq.nlargest)으로 합쳐서 만든다.
+# -> 전체 df 를 다시 정렬하지 않고, 조회 비용은 (페이지 수 x max_size) 에 비례한다.
+
+RECENT_POINTS = 4  # 최근 1시간
+BASE_POINTS = 8  # 그 직전 2시간
+MIN_BASE = 5.0  # 직전 구간 평균 하한 (리포트가 거의 없던 서비스의 증가율이 무한대로 튀지 않도록)
+MIN_RECENT = 10.0  # 최근 구간 평균이 이보다 적으면 순위에서 뺀다.
+
+
+class Mover(NamedTuple):
+    growth: float  # 증가율 (최근 평균 / 직전 평균 - 1)
+    name: str
+    area: str
+    category: str
+    recent: float  # 최근 구간 평균 리포트 수
+    base: float  # 직전 구간 평균 리포트 수
+
+
+# 리턴: (증가율, 최근 평균, 직전 평균) float32 배열
+def get_growth(values_matrix):
+    matrix = values_matrix.astype(np.float32, copy=False)
+    recent = matrix[:, -RECENT_POINTS:].mean(axis=1)
+    base = matrix[:, -(RECENT_POINTS + BASE_POINTS):-RECENT_POINTS].mean(axis=1)
+    growth = recent / np.maximum(base, MIN_BASE) - 1
+    return growth, recent, base
+
+
+class TopMovers:
+    def __init__(self, max_size=20):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._page_dict = dict()  # (지역, 카테고리) -> 해당 페이지 상위 Mover 리스트
+        self.updated_at = 0.0
+
+    # 카테고리 페이지 1개 반영. 해당 페이지의 이전 값은 교체된다.
+    # values_matrix : 크롤링할 때 만든 페이지의 서비스 x 포인트 리포트 수 행렬 (df 의 행 순서와 같음)
+    def update_page(self, area, category, df_, values_matrix):
+        if df_ is None or len(df_) == 0:
+            return
+
+        growth, recent, base = get_growth(values_matrix)
+
+        # 페이지 안에서도 전체 정렬 대신 argpartition 으로 상위 max_size 개만 고른다.
+        candidate_rows = np.flatnonzero((recent >= MIN_RECENT) & (growth > 0))
+        if len(candidate_rows) > self.max_size:
+            top = np.argpartition(-growth[candidate_rows], self.max_size - 1)[:self.max_size]
+            candidate_rows = candidate_rows[top]
+
+        name_array = df_[get_downdetector_web.NAME].to_numpy()
+        mover_list = [Mover(growth=float(growth[row]), name=name_array[row], area=area, category=category,
+                            recent=float(recent[row]), base=float(base[row])) for row in candidate_rows]
+
+        with self._lock:
+            self._page_dict[(area, category)] = mover_list
+            self.updated_at = time.time()
+
+    # 리턴: 증가율 높은 순 Mover 리스트 (area 가 None 이면 전체 지역)
+    def get_top(self, area=None, size=None):
+        size = size or self.max_size
+        with self._lock:
+            page_list = [mover_list for (area_key, _), mover_list in self._page_dict.items()
+                         if area is None or area_key == area]
+
+        # 여러 카테고리에 같은 서비스가 있으면 증가율이 가장 높은 것 하나만 남긴 뒤 상위 size 개를 고른다.
+        best_dict = dict()
+        for mover in chain.from_iterable(page_list):
+            best = best_dict.get((mover.area, mover.name))
+            if best is None or mover > best:
+                best_dict[(mover.area, mover.name)] = mover
+        return heapq.nlargest(size, best_dict.values())
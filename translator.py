@@ -0,0 +1,122 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+# 로깅 설정
+# logging.basicConfig(level=logging.INFO)
+
+
+# # # # # # # # # # # # # # #
+# 영어 -> 한국어 번역 (모든 세션 공용 캐시)
+# # # # # # # # # # # # # # #
+
+# 캐시는 프로세스 안에서 공유하고, 파일에는 (원문, 번역문) 튜플 리스트로 저장한다. (기존 캐시 파일과 같은 형식)
+# 번역이 몰릴 때 매번 파일을 쓰지 않도록 save_interval_sec 마다 한번만 저장한다.
+class TranslationCache:
+    def __init__(self, cache_file, max_size=1000, save_interval_sec=5):
+        self.cache_file = cache_file
+        self.max_size = max_size
+        self.save_interval_sec = save_interval_sec
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # 원문 -> 번역문 (오래된 것부터)
+        self._dirty = False
+        self._saved_at = 0.0
+
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f_:
+                    for eng_text, kor_text in pickle.load(f_)[-max_size:]:
+                        self._cache[eng_text] = kor_text
+                logging.info(f'번역 캐시 파일 로딩 완료 : {cache_file} {len(self._cache)}개')
+            except Exception as e:
+                logging.error(f'번역 캐시 파일 로딩 실패 - {e}')
+
+    def get(self, eng_text):
+        with self._lock:
+            kor_text = self._cache.get(eng_text)
+            if kor_text is not None:
+                self._cache.move_to_end(eng_text)
+            return kor_text
+
+    def put(self, eng_text, kor_text):
+        with self._lock:
+            self._cache[eng_text] = kor_text
+            self._cache.move_to_end(eng_text)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+            self._dirty = True
+            need_save = time.monotonic() - self._saved_at >= self.save_interval_sec
+
+        if need_save:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            item_list = list(self._cache.items())
+            self._dirty = False
+            self._saved_at = time.monotonic()
+
+        try:
+            with open(self.cache_file + '.tmp', 'wb') as f_:
+                pickle.dump(item_list, f_)
+            os.replace(self.cache_file + '.tmp', self.cache_file)
+            logging.info('번역 캐시 파일 업데이트 완료')
+        except Exception as e:
+            logging.error(f'번역 캐시 파일 저장 실패 - {e}')
+
+
+class Translator:
+    def __init__(self, key_path, cache, slot_func=None, host=None):
+        self.key_path = key_path
+        self.cache = cache
+        self.slot_func = slot_func  # 호스트 요청 제한 (host -> context manager)
+        self.host = host
+        self._client_lock = threading.Lock()
+        self._client = None
+
+    # 구글 번역 클라이언트는 처음 번역할 때 1번만 만든다. 키 파일이 없으면 None
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None and os.path.exists(self.key_path):
+                from google.cloud import translate_v2 as translate  # pip install google-cloud-translate==2.0.1
+                from google.oauth2 import service_account
+
+                credential_trans = service_account.Credentials.from_service_account_file(self.key_path)
+                self._client = translate.Client(credentials=credential_trans)
+            return self._client
+
+    # 리턴: 번역문. 키 파일이 없거나 번역에 실패하면 ''
+    def translate(self, text):
+        # 캐시를 먼저 뒤져본다.
+        cache_text = self.cache.get(text)
+        if cache_text:
+            logging.info('trans cache hit! - ' + text + ' : ' + cache_text)
+            return cache_text  # 캐시힛!
+
+        # 캐시에 없으면 구글 api로 번역을 한다.
+        translate_client = self._get_client()
+        if translate_client is None:
+            return ''
+
+        try:
+            if self.slot_func is not None:
+                with self.slot_func(self.host):
+                    result = translate_client.translate(text, target_language='ko')
+            else:
+                result = translate_client.translate(text, target_language='ko')
+        except Exception as e:
+            logging.error(f'번역 실패 - {text} - {e}')
+            return ''
+
+        translated_text = result['translatedText'].replace('&amp;', '&')
+
+        # 캐시에 저장한다.
+        self.cache.put(text, translated_text)
+        return translated_text